@@ -0,0 +1,78 @@
+# angle_corrector.py
+# Поправка измеренного расстояния (px) в зависимости от угла наклона камеры — та же кубическая
+# интерполяция, что в create_distortion_corrector (camera_calibrate/4_nov/result/visual_4.py),
+# но в виде коэффициентов сплайна: сохраняется в JSON, загружается без SciPy
+# и считается на NumPy сразу для массивов (угол, расстояние).
+import json
+
+import numpy as np
+
+FORMAT_VERSION = 1
+# Углы, по которым оценивается истинное расстояние (центр кадра), рад
+CENTER_ANGLE = 0.1
+
+
+class AngleCorrector:
+    """
+    Кусочно-кубический поправочный коэффициент k(угол); исправленное расстояние —
+    measured_px * k(angle). На отрезке [x_i, x_{i+1}]:
+    k = c0 + c1*t + c2*t^2 + c3*t^3, t = angle - x_i. За пределами узлов
+    используются крайние отрезки (экстраполяция, как fill_value="extrapolate").
+    """
+
+    def __init__(self, breakpoints, coefficients, true_distance):
+        self.breakpoints = np.asarray(breakpoints, dtype=np.float64)
+        # Форма (отрезки, 4): c0..c3 по возрастанию степени
+        self.coefficients = np.asarray(coefficients, dtype=np.float64).reshape(-1, 4)
+        self.true_distance = float(true_distance)
+
+    @classmethod
+    def fit(cls, angles, measurements, center_angle=CENTER_ANGLE):
+        """Подбор по калибровочным замерам (нужен SciPy — только здесь)"""
+        from scipy.interpolate import CubicSpline
+
+        angles = np.asarray(angles, dtype=np.float64)
+        measurements = np.asarray(measurements, dtype=np.float64)
+        true_distance = np.median(measurements[np.abs(angles) < center_angle])
+        order = np.argsort(angles)
+        # interp1d(kind='cubic') строит тот же сплайн с условием not-a-knot
+        spline = CubicSpline(angles[order], true_distance / measurements[order],
+                             bc_type='not-a-knot')
+        # У CubicSpline коэффициенты по убыванию степени: c[0] при t^3
+        return cls(spline.x, spline.c[::-1].T, true_distance)
+
+    def factor(self, angle):
+        """Поправочный коэффициент для массива углов"""
+        angle = np.asarray(angle, dtype=np.float64)
+        i = np.clip(np.searchsorted(self.breakpoints, angle, side='right') - 1,
+                    0, len(self.coefficients) - 1)
+        t = angle - self.breakpoints[i]
+        c = self.coefficients[i]
+        return c[..., 0] + t * (c[..., 1] + t * (c[..., 2] + t * c[..., 3]))
+
+    def __call__(self, angle, measured_px):
+        return np.asarray(measured_px, dtype=np.float64) * self.factor(angle)
+
+    def to_dict(self):
+        """Формат для приложения (lib/screen/utils/angle_corrector.dart)"""
+        return {
+            'version': FORMAT_VERSION,
+            'trueDistance': self.true_distance,
+            'breakpoints': self.breakpoints.tolist(),
+            'coefficients': self.coefficients.ravel().tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Неизвестная версия корректора: {data.get('version')}")
+        return cls(data['breakpoints'], data['coefficients'], data['trueDistance'])
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
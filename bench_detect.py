@@ -0,0 +1,70 @@
+# bench_detect.py
+# Сравнение поиска углов на полном разрешении и грубого поиска на уменьшенной копии:
+# время, количество найденных досок, RMS калибровки и расхождение углов.
+import argparse
+import os
+import time
+
+import numpy as np
+
+import cc
+from image_loader import FrameStore
+
+DATASETS = ["camera_calibrate/old", "camera_calibrate/old2", "camera_calibrate/old3",
+            "camera_calibrate/old4", "camera_calibrate/4_nov"]
+SCALES = [1.0, 0.5, 0.25]
+
+
+def run(images, scale, workers, store=None):
+    start = time.perf_counter()
+    results = cc.detect_all(images, workers=workers, scale=scale, store=store)
+    elapsed = time.perf_counter() - start
+
+    objp = cc.make_object_points()
+    found = {fname: corners for fname, _, corners in results if corners is not None}
+    rms = None
+    if len(found) >= 3:
+        image_size = next(size for _, size, corners in results if corners is not None)
+        rms = cc.calibrate([objp] * len(found), list(found.values()), image_size)[0]
+    return elapsed, found, rms
+
+
+def corner_delta(corners, reference):
+    """Максимальное расхождение углов; доска может быть найдена в обратном порядке обхода"""
+    a = corners.reshape(-1, 2)
+    b = reference.reshape(-1, 2)
+    return min(np.abs(a - b).max(), np.abs(a[::-1] - b).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк грубого поиска углов")
+    parser.add_argument("datasets", nargs="*", default=DATASETS)
+    parser.add_argument("--scales", type=float, nargs="+", default=SCALES)
+    parser.add_argument("--workers", type=int, default=cc.WORKERS)
+    args = parser.parse_args()
+
+    store = FrameStore()
+    print(f"{'набор':<28}{'масштаб':>8}{'время, с':>10}{'найдено':>10}{'RMS':>10}{'Δуглов, px':>12}")
+    for images_dir in args.datasets:
+        images = cc.find_images(images_dir)
+        if not images:
+            print(f"⚠️ Нет снимков в {images_dir}")
+            continue
+
+        reference = None
+        for scale in args.scales:
+            elapsed, found, rms = run(images, scale, args.workers, store)
+            if reference is None:
+                reference = found
+
+            # Максимальное расхождение углов с первым (эталонным) масштабом на общих снимках
+            common = [f for f in found if f in reference]
+            delta = max((corner_delta(found[f], reference[f]) for f in common), default=float('nan'))
+            rms_str = f"{rms:.4f}" if rms is not None else "-"
+            print(f"{os.path.basename(images_dir):<28}{scale:>8.2f}{elapsed:>10.1f}"
+                  f"{len(found):>6}/{len(images):<3}{rms_str:>10}{delta:>12.3f}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
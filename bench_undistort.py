@@ -0,0 +1,64 @@
+# bench_undistort.py
+# Точность и скорость обратной дисторсии: таблица (UndistortLUT), метод Ньютона
+# и cv2.undistortPoints на одном наборе случайных точек кадра.
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from distortion import UndistortLUT, distort_points, load_calibration, undistort_points
+
+
+REPEATS = 5
+
+
+def timed(func, repeats=1):
+    """Лучшее время из repeats запусков и результат"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк обратной дисторсии")
+    parser.add_argument("--calibration", default="assets/calibration_data.json")
+    parser.add_argument("--width", type=int, default=2620)
+    parser.add_argument("--height", type=int, default=3737)
+    parser.add_argument("--points", type=int, default=2_000_000)
+    parser.add_argument("--step", type=int, default=8, help="шаг таблицы, px")
+    args = parser.parse_args()
+
+    K, D = load_calibration(args.calibration)
+    rng = np.random.default_rng(0)
+    u = rng.uniform(0, args.width, args.points)
+    v = rng.uniform(0, args.height, args.points)
+
+    build_time, lut = timed(lambda: UndistortLUT(K, D, (args.width, args.height), args.step))
+    print(f"Таблица {lut.nu}x{lut.nv} построена за {build_time * 1000:.1f} мс")
+
+    pts = np.stack([u, v], axis=-1).reshape(-1, 1, 2)
+    methods = {
+        "cv2.undistortPoints": lambda: tuple(
+            cv2.undistortPoints(pts, K, D, P=K).reshape(-1, 2).T),
+        "Ньютон (5 итераций)": lambda: undistort_points(u, v, K, D, iterations=5),
+        "таблица": lambda: lut.undistort(u, v),
+        "таблица + 1 Ньютон": lambda: lut.undistort(u, v, refine=1),
+        "таблица + 2 Ньютона": lambda: lut.undistort(u, v, refine=2),
+    }
+
+    # Точность — по невязке прямой модели: distort(undistort(p)) должен вернуть p
+    print(f"\n{'метод':<24}{'время, мс':>12}{'Мточек/с':>10}{'макс. невязка, px':>20}{'средняя, px':>14}")
+    for name, func in methods.items():
+        elapsed, (ux, uy) = timed(func, REPEATS)
+        du, dv = distort_points(ux, uy, K, D)
+        err = np.hypot(du - u, dv - v)
+        print(f"{name:<24}{elapsed * 1000:>12.1f}{args.points / elapsed / 1e6:>10.1f}"
+              f"{err.max():>20.2e}{err.mean():>14.2e}")
+
+
+if __name__ == "__main__":
+    main()
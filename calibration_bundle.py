@@ -0,0 +1,151 @@
+# calibration_bundle.py
+# Бинарный пакет калибровки: заголовок, таблица секций и сами секции как сырые массивы.
+# Любую секцию можно открыть через np.memmap, не читая остальные, — поэтому большие
+# дополнительные секции (таблицы remap, LUT) не замедляют загрузку параметров камеры.
+#
+# Формат файла (little-endian), версия 1:
+#   char[4]    "GCAL"
+#   uint16     версия
+#   uint16     количество секций N
+#   N раз:     char[16] имя, char[4] dtype ('<f8', '<i2', ...), uint32 число измерений,
+#              uint32[4] форма, uint64 смещение от начала файла
+#   далее секции, каждая выровнена по ALIGNMENT байт
+#
+# Обязательные секции: camera_matrix (3x3 f8), dist_coeffs (5 f8), image_size (2 u4).
+# Необязательные: rvecs, tvecs (N x 3 f8), remap1_<w>x<h> (h x w x 2 i2) и
+# remap2_<w>x<h> (h x w u2) из remap_tables.build_remap, lut_x/lut_y/lut_grid из
+# distortion.UndistortLUT.
+import struct
+
+import numpy as np
+
+MAGIC = b"GCAL"
+VERSION = 1
+ALIGNMENT = 64
+
+_HEADER = struct.Struct("<4sHH")
+_SECTION = struct.Struct("<16s4sI4IQ")
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_bundle(path, sections):
+    """
+    Записывает словарь {имя: массив} в пакет. Порядок секций сохраняется,
+    обязательные секции лучше ставить первыми — они окажутся в начале файла.
+    """
+    arrays = []
+    for name, array in sections.items():
+        array = np.ascontiguousarray(array)
+        array = array.astype(array.dtype.newbyteorder('<'), copy=False)
+        if len(name.encode()) > 16 or array.ndim > 4:
+            raise ValueError(f"Секция {name!r} не помещается в таблицу секций")
+        arrays.append((name, array))
+
+    offset = _align(_HEADER.size + len(arrays) * _SECTION.size)
+    table, offsets = [], []
+    for name, array in arrays:
+        shape = list(array.shape) + [0] * (4 - array.ndim)
+        table.append(_SECTION.pack(name.encode(), array.dtype.str.encode(), array.ndim,
+                                   *shape, offset))
+        offsets.append(offset)
+        offset = _align(offset + array.nbytes)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(arrays)))
+        f.write(b"".join(table))
+        for (_, array), start in zip(arrays, offsets):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(array.tobytes())
+
+
+def make_sections(K, D, image_size=None, rvecs=None, tvecs=None, remap_sizes=(), lut_step=None):
+    """Секции пакета по результату калибровки; remap и LUT строятся только по запросу"""
+    K = np.asarray(K, dtype=np.float64).reshape(3, 3)
+    D = np.ravel(np.asarray(D, dtype=np.float64))[:5]
+    sections = {
+        'camera_matrix': K,
+        'dist_coeffs': D,
+        'image_size': np.asarray(image_size or (0, 0), dtype=np.uint32),
+    }
+    if rvecs is not None and len(rvecs):
+        sections['rvecs'] = np.reshape(rvecs, (-1, 3)).astype(np.float64)
+        sections['tvecs'] = np.reshape(tvecs, (-1, 3)).astype(np.float64)
+    if remap_sizes:
+        from remap_tables import build_remap
+        for width, height in remap_sizes:
+            map1, map2 = build_remap(K, D, (width, height))
+            sections[f'remap1_{width}x{height}'] = map1
+            sections[f'remap2_{width}x{height}'] = map2
+    if lut_step:
+        if not image_size:
+            raise ValueError("Для LUT нужен размер кадра")
+        from distortion import UndistortLUT
+        lut = UndistortLUT(K, D, image_size, step=lut_step)
+        sections['lut_x'] = lut.map_x
+        sections['lut_y'] = lut.map_y
+        sections['lut_grid'] = np.array([lut.u0, lut.v0, lut.step], dtype=np.float64)
+    return sections
+
+
+class CalibrationBundle:
+    """
+    Пакет калибровки, открытый для чтения. При открытии читается только заголовок;
+    секции отображаются в память (np.memmap) по первому обращению.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path}: неизвестный формат пакета калибровки "
+                                 f"({magic!r}, версия {version})")
+            table = f.read(count * _SECTION.size)
+        self._sections = {}
+        for i in range(count):
+            name, dtype, ndim, *shape, offset = _SECTION.unpack_from(table, i * _SECTION.size)
+            self._sections[name.rstrip(b"\0").decode()] = (
+                np.dtype(dtype.rstrip(b"\0").decode()), tuple(shape[:ndim]), offset)
+
+    def __contains__(self, name):
+        return name in self._sections
+
+    @property
+    def names(self):
+        return list(self._sections)
+
+    def section(self, name):
+        """Секция как np.memmap только для чтения"""
+        dtype, shape, offset = self._sections[name]
+        return np.memmap(self.path, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+    @property
+    def camera_matrix(self):
+        return np.array(self.section('camera_matrix'))
+
+    @property
+    def dist_coeffs(self):
+        return np.array(self.section('dist_coeffs'))
+
+    @property
+    def image_size(self):
+        width, height = self.section('image_size')
+        return (int(width), int(height)) if width else None
+
+    def remap_sizes(self):
+        return [tuple(map(int, name[len('remap1_'):].split('x')))
+                for name in self._sections if name.startswith('remap1_')]
+
+    def remap(self, width, height):
+        """(map1, map2) для cv2.remap или None, если таблиц для этого размера нет"""
+        name = f'{width}x{height}'
+        if f'remap1_{name}' not in self:
+            return None
+        return self.section(f'remap1_{name}'), self.section(f'remap2_{name}')
+
+
+def save_bundle(path, K, D, image_size=None, rvecs=None, tvecs=None, remap_sizes=(), lut_step=None):
+    write_bundle(path, make_sections(K, D, image_size, rvecs, tvecs, remap_sizes, lut_step))
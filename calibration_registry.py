@@ -0,0 +1,119 @@
+# calibration_registry.py
+# Реестр калибровок для нескольких телефонов: модель устройства, id камеры
+# (как в CameraFocalLength.getCameraFocalLength: "0" — основная, "1" — фронтальная)
+# и разрешение кадра. Пакеты .calib лежат по папкам устройств, а index.json
+# отображает ключ на файл — поиск не требует обхода папок и открытия пакетов.
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+from calibration_bundle import CalibrationBundle, save_bundle
+
+REGISTRY_DIR = "calibration_registry"
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+
+
+def device_slug(device):
+    """
+    Имя папки устройства: 'Pixel 7 Pro' -> 'pixel_7_pro'. Если в названии есть символы
+    вне латиницы и цифр ('Редми Ноут'), добавляется короткий sha1 названия, чтобы
+    имя не было пустым и разные устройства не совпадали.
+    """
+    slug = re.sub(r'[^0-9a-z]+', '_', device.lower()).strip('_')
+    if re.search(r'[^0-9a-z\s_.,()+/-]', device.lower()):
+        digest = hashlib.sha1(device.encode('utf-8')).hexdigest()[:8]
+        slug = f"{slug}_{digest}" if slug else digest
+    if not slug:
+        raise ValueError(f"Пустое название устройства: {device!r}")
+    return slug
+
+
+def make_key(device, camera_id, image_size):
+    width, height = image_size
+    return f"{device_slug(device)}/{camera_id}/{width}x{height}"
+
+
+class CalibrationRegistry:
+    """
+    Папка с пакетами калибровки и индексом. Индекс читается один раз при открытии,
+    дальше get/path — поиск в словаре.
+    """
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+        self._entries = {}
+        self._dirty = False
+        index_path = os.path.join(root, INDEX_FILENAME)
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') != INDEX_VERSION:
+                raise ValueError(f"{index_path}: неизвестная версия индекса {index.get('version')}")
+            self._entries = index['entries']
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def entries(self):
+        return dict(self._entries)
+
+    def path(self, device, camera_id, image_size):
+        """Путь к пакету калибровки или None, если устройство не откалибровано"""
+        entry = self._entries.get(make_key(device, camera_id, image_size))
+        return os.path.join(self.root, entry['file']) if entry else None
+
+    def get(self, device, camera_id, image_size):
+        path = self.path(device, camera_id, image_size)
+        return CalibrationBundle(path) if path else None
+
+    def add(self, device, camera_id, K, D, image_size, rvecs=None, tvecs=None,
+            remap_sizes=(), rms=None):
+        """Записывает пакет калибровки (заменяя прежний для того же ключа) и обновляет индекс"""
+        camera_id = str(camera_id)
+        width, height = image_size
+        key = make_key(device, camera_id, image_size)
+        slug = device_slug(device)
+        # Путь в индексе — всегда относительно корня реестра
+        file = f"{slug}/camera{camera_id}_{width}x{height}.calib"
+        os.makedirs(os.path.join(self.root, slug), exist_ok=True)
+        save_bundle(os.path.join(self.root, file), K, D, image_size, rvecs, tvecs, remap_sizes)
+        self._entries[key] = {
+            'device': device, 'camera_id': camera_id, 'width': width, 'height': height,
+            'file': file, 'rms': None if rms is None else float(rms),
+        }
+        self._dirty = True
+        return key
+
+    def add_npz(self, device, camera_id, npz_path, image_size=None, remap_sizes=()):
+        """Регистрирует результат cc.py; размер кадра берется из .npz, если он там сохранен"""
+        with np.load(npz_path) as data:
+            if image_size is None:
+                if 'image_width' not in data:
+                    raise ValueError(f"{npz_path}: размер кадра не сохранен, укажите его явно")
+                image_size = (int(data['image_width']), int(data['image_height']))
+            return self.add(device, camera_id, data['camera_matrix'], data['dist_coeffs'],
+                            image_size,
+                            data['rvecs'] if 'rvecs' in data else None,
+                            data['tvecs'] if 'tvecs' in data else None,
+                            remap_sizes)
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        index_path = os.path.join(self.root, INDEX_FILENAME)
+        # Временный файл и подмена, как в CornerCache.save
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'entries': self._entries}, f,
+                      indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, index_path)
+        self._dirty = False
@@ -1,7 +1,19 @@
+import os
+import sys
+import tempfile
+
 import numpy as np
 import cv2
 import matplotlib.pyplot as plt
 
+# grid_render.py и distortion.py лежат в корне репозитория
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from grid_render import LineLayer, render_tiled, undistort_tiled
+
+# Рисовать и исправлять сетку полосами сразу в PNG, без полноразмерных массивов.
+# Для предпросмотра файлы читаются уменьшенными. False — как раньше, целиком в памяти.
+TILED = True
+
 # Ваши параметры камеры
 camera_matrix = np.array([[3283.03741, 0, 1310.40704],
                          [0, 3317.08032, 1868.84888],
@@ -10,25 +22,34 @@ dist_coeffs = np.array([-0.04290051, -0.00711483, -0.00979527, 0.00517716, 0.080
 
 # Создаем пустое изображение
 width, height = 2620, 3737
-image = np.ones((height, width, 3), dtype=np.uint8) * 255
 
 # Рисуем идеальную сетку (красные линии)
 grid_size = 10
 step_x = width // grid_size
 step_y = height // grid_size
 
-# Вертикальные линии
-for i in range(grid_size + 1):
-    x = i * step_x
-    cv2.line(image, (x, 0), (x, height), (0, 0, 255), 2)  # Красный
-
-# Горизонтальные линии  
-for i in range(grid_size + 1):
-    y = i * step_y
-    cv2.line(image, (0, y), (width, y), (0, 0, 255), 2)  # Красный
-
-# Применяем дисторсию к изображению
-distorted_image = cv2.undistort(image, camera_matrix, dist_coeffs)
+# Вертикальные и горизонтальные линии
+lines = [[(i * step_x, 0), (i * step_x, height)] for i in range(grid_size + 1)] + \
+        [[(0, i * step_y), (width, i * step_y)] for i in range(grid_size + 1)]
+
+if TILED:
+    grid = [LineLayer(lines, (0, 0, 255), 2)]  # Красный
+    # PNG нужны только для предпросмотра — пишем их во временную папку
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ideal_path = os.path.join(tmp_dir, "grid_ideal.png")
+        undistorted_path = os.path.join(tmp_dir, "grid_undistorted.png")
+        render_tiled(ideal_path, width, height, grid)
+        # Применяем дисторсию к изображению по полосам
+        undistort_tiled(undistorted_path, width, height, grid, camera_matrix, dist_coeffs)
+        image = cv2.imread(ideal_path, cv2.IMREAD_REDUCED_COLOR_4)
+        distorted_image = cv2.imread(undistorted_path, cv2.IMREAD_REDUCED_COLOR_4)
+else:
+    image = np.ones((height, width, 3), dtype=np.uint8) * 255
+    for p0, p1 in lines:
+        cv2.line(image, p0, p1, (0, 0, 255), 2)  # Красный
+
+    # Применяем дисторсию к изображению
+    distorted_image = cv2.undistort(image, camera_matrix, dist_coeffs)
 
 # Показываем результаты
 plt.figure(figsize=(15, 6))
@@ -54,40 +54,46 @@ camera_matrix = np.array([
 
 dist_coeffs = np.array([-0.04290051, -0.00711483, -0.00979527, 0.00517716, 0.08015856])
 
-def correct_distortion_for_points(angles, measured_distances, camera_matrix, dist_coeffs):
+# Радиус от центра для позиционирования точек
+POINT_RADIUS = 1500
+# Сколько пар точек передавать в cv2.undistortPoints за один вызов:
+# длинные записи замеров обрабатываются кусками, чтобы не раздувать память
+BATCH_SIZE = 1 << 18
+
+def correct_distortion_for_points(angles, measured_distances, camera_matrix, dist_coeffs,
+                                  batch_size=BATCH_SIZE):
     """
-    Корректирует дисторсию для измеренных расстояний между точками
+    Корректирует дисторсию для измеренных расстояний между точками.
+    Концы отрезков для всех углов строятся одним массивом (N, 2, 2), исправляются
+    одним вызовом cv2.undistortPoints на кусок и измеряются одной векторной нормой.
     """
-    corrected_distances = []
+    angles = np.asarray(angles, dtype=np.float64)
+    measured_distances = np.asarray(measured_distances, dtype=np.float64)
     center_x, center_y = camera_matrix[0, 2], camera_matrix[1, 2]  # главная точка
-    
-    for angle, dist_px in zip(angles, measured_distances):
-        # Создаем две точки на измеренном расстоянии друг от друга
-        # Предполагаем, что точки расположены горизонтально
-        point1 = [center_x - dist_px/2, center_y]
-        point2 = [center_x + dist_px/2, center_y]
-        
-        # Поворачиваем точки вокруг центра для имитации положения в кадре
-        cos_a, sin_a = np.cos(angle), np.sin(angle)
-        radius = 1500  # радиус от центра для позиционирования точек
-        
-        offset_x = radius * sin_a
-        offset_y = radius * cos_a
-        
-        point1_rotated = [point1[0] + offset_x, point1[1] + offset_y]
-        point2_rotated = [point2[0] + offset_x, point2[1] + offset_y]
-        
-        # Корректируем дисторсию для обеих точек
-        points = np.array([point1_rotated, point2_rotated], dtype=np.float32).reshape(-1, 1, 2)
-        corrected_points = cv2.undistortPoints(points, camera_matrix, dist_coeffs, P=camera_matrix)
-        
-        # Вычисляем исправленное расстояние
-        pt1_corrected = corrected_points[0][0]
-        pt2_corrected = corrected_points[1][0]
-        corrected_dist = np.linalg.norm(pt1_corrected - pt2_corrected)
-        corrected_distances.append(corrected_dist)
-    
-    return np.array(corrected_distances)
+
+    corrected_distances = np.empty(len(angles))
+    for start in range(0, len(angles), batch_size):
+        angle = angles[start:start + batch_size]
+        half = measured_distances[start:start + batch_size] / 2
+
+        # Две точки на измеренном расстоянии друг от друга, расположенные горизонтально
+        # и сдвинутые вокруг центра для имитации положения в кадре
+        offset_x = POINT_RADIUS * np.sin(angle)
+        offset_y = POINT_RADIUS * np.cos(angle)
+        points = np.empty((len(angle), 2, 2), dtype=np.float32)
+        points[:, 0, 0] = center_x - half + offset_x
+        points[:, 1, 0] = center_x + half + offset_x
+        points[:, :, 1] = (center_y + offset_y)[:, None]
+
+        # Корректируем дисторсию для всех точек сразу
+        corrected = cv2.undistortPoints(points.reshape(-1, 1, 2), camera_matrix, dist_coeffs,
+                                        P=camera_matrix).reshape(-1, 2, 2)
+
+        # Вычисляем исправленные расстояния
+        corrected_distances[start:start + batch_size] = np.linalg.norm(
+            corrected[:, 0] - corrected[:, 1], axis=1)
+
+    return corrected_distances
 
 # Применяем коррекцию дисторсии
 corrected_px = correct_distortion_for_points(angles, measured_px, camera_matrix, dist_coeffs)
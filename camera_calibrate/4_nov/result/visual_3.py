@@ -54,58 +54,93 @@ camera_matrix = np.array([
 
 dist_coeffs = np.array([-0.04290051, -0.00711483, -0.00979527, 0.00517716, 0.08015856])
 
+# Диапазон перебора высоты точек и примерный радиус (как в исходном переборе)
+Y_RANGE = (500, 2500)
+Y_STEP = 100
+RADIUS = 2000
+# Диапазон радиуса при совместной оптимизации высоты и радиуса (fit_radius=True)
+RADIUS_RANGE = (500, 5000)
+RADIUS_STEP = 250
+
 def correct_measured_distance(measured_distance, x_position, y_position, camera_matrix, dist_coeffs):
     """
-    Корректирует измеренное расстояние с учетом дисторсии
+    Корректирует измеренное расстояние с учетом дисторсии.
+    Аргументы могут быть массивами любой (совместимой) формы — все точки
+    исправляются одним вызовом cv2.undistortPoints.
+    """
+    measured_distance, x_position, y_position = np.broadcast_arrays(
+        np.asarray(measured_distance, dtype=np.float64), x_position, y_position)
+
+    # Две точки на измеренном расстоянии, расположенные горизонтально на высоте y_position
+    points = np.empty(measured_distance.shape + (2, 2), dtype=np.float32)
+    points[..., 0, 0] = x_position - measured_distance / 2
+    points[..., 1, 0] = x_position + measured_distance / 2
+    points[..., :, 1] = y_position[..., None]
+
+    # Корректируем дисторсию для всех точек сразу
+    corrected = cv2.undistortPoints(points.reshape(-1, 1, 2), camera_matrix, dist_coeffs,
+                                    P=camera_matrix).reshape(points.shape)
+
+    # Вычисляем исправленные расстояния
+    corrected_dist = np.linalg.norm(corrected[..., 0, :] - corrected[..., 1, :], axis=-1)
+    return corrected_dist if corrected_dist.ndim else float(corrected_dist)
+
+def corrected_for_positions(angles, measured_px, y_positions, radii, camera_matrix, dist_coeffs):
+    """
+    Исправленные расстояния для всех комбинаций высоты и радиуса одной пачкой:
+    результат формы (высоты, радиусы, замеры)
     """
-    # Предполагаем, что точки расположены горизонтально на высоте y_position
-    center_x = camera_matrix[0, 2]
-    
-    # Создаем две точки на измеренном расстоянии
-    point1 = [x_position - measured_distance/2, y_position]
-    point2 = [x_position + measured_distance/2, y_position]
-    
-    # Корректируем дисторсию для обеих точек
-    points = np.array([point1, point2], dtype=np.float32).reshape(-1, 1, 2)
-    corrected_points = cv2.undistortPoints(points, camera_matrix, dist_coeffs, P=camera_matrix)
-    
-    # Вычисляем исправленное расстояние
-    pt1_corrected = corrected_points[0][0]
-    pt2_corrected = corrected_points[1][0]
-    corrected_dist = np.linalg.norm(pt1_corrected - pt2_corrected)
-    
-    return corrected_dist
+    y = np.asarray(y_positions, dtype=np.float64)[:, None, None]
+    radius = np.asarray(radii, dtype=np.float64)[None, :, None]
+    # x-позиция на основе угла (точки движутся по горизонтали)
+    x_position = camera_matrix[0, 2] + radius * np.tan(angles)
+    return correct_measured_distance(measured_px, x_position, y, camera_matrix, dist_coeffs)
 
 # ПРАВИЛЬНЫЙ ПОДХОД: находим оптимальную высоту и позицию точек
-def find_optimal_correction(angles, measured_px, camera_matrix, dist_coeffs):
+def find_optimal_correction(angles, measured_px, camera_matrix, dist_coeffs, fit_radius=False):
     """
-    Находит оптимальные параметры для коррекции, минимизируя разброс
+    Находит оптимальные параметры для коррекции, минимизируя разброс.
+    Сначала вся сетка высот (и радиусов при fit_radius) считается одной пачкой,
+    затем лучший узел уточняется: по высоте — ограниченным одномерным поиском,
+    по высоте и радиусу — методом Нелдера–Мида.
     """
-    # Пробуем разные высоты расположения точек
-    best_std = float('inf')
-    best_corrected = None
-    best_y_position = None
-    
-    center_x = camera_matrix[0, 2]
-    
-    for test_y in range(500, 2500, 100):  # Перебираем возможные высоты
-        corrected_distances = []
-        
-        for angle, dist_px in zip(angles, measured_px):
-            # Вычисляем x-позицию на основе угла (точки движутся по горизонтали)
-            radius = 2000  # примерный радиус
-            x_position = center_x + radius * np.tan(angle)
-            
-            corrected_dist = correct_measured_distance(dist_px, x_position, test_y, camera_matrix, dist_coeffs)
-            corrected_distances.append(corrected_dist)
-        
-        current_std = np.std(corrected_distances)
-        if current_std < best_std:
-            best_std = current_std
-            best_corrected = corrected_distances
-            best_y_position = test_y
-    
-    return np.array(best_corrected), best_y_position, best_std
+    from scipy.optimize import minimize, minimize_scalar
+
+    angles = np.asarray(angles, dtype=np.float64)
+    measured_px = np.asarray(measured_px, dtype=np.float64)
+    heights = np.arange(*Y_RANGE, Y_STEP)
+    radii = np.arange(RADIUS_RANGE[0], RADIUS_RANGE[1] + 1, RADIUS_STEP) if fit_radius else [RADIUS]
+
+    # Грубая сетка: разброс для каждой пары (высота, радиус)
+    stds = np.std(corrected_for_positions(angles, measured_px, heights, radii,
+                                          camera_matrix, dist_coeffs), axis=-1)
+    iy, ir = np.unravel_index(np.argmin(stds), stds.shape)
+
+    def spread(y, radius):
+        return np.std(corrected_for_positions(angles, measured_px, [y], [radius],
+                                              camera_matrix, dist_coeffs))
+
+    # Уточнение в пределах соседних узлов сетки
+    y_bounds = (max(Y_RANGE[0], heights[iy] - Y_STEP), min(Y_RANGE[1], heights[iy] + Y_STEP))
+    if fit_radius:
+        r_bounds = (max(RADIUS_RANGE[0], radii[ir] - RADIUS_STEP),
+                    min(RADIUS_RANGE[1], radii[ir] + RADIUS_STEP))
+        result = minimize(lambda p: spread(*p), [heights[iy], radii[ir]], method='Nelder-Mead',
+                          bounds=[y_bounds, r_bounds], options={'xatol': 0.1, 'fatol': 1e-6})
+        best_y, best_radius = result.x
+    else:
+        result = minimize_scalar(lambda y: spread(y, RADIUS), bounds=y_bounds, method='bounded',
+                                 options={'xatol': 0.1})
+        best_y, best_radius = result.x, RADIUS
+
+    best_std = result.fun
+    if stds[iy, ir] <= best_std:
+        # Узел сетки оказался не хуже уточненного значения
+        best_y, best_radius, best_std = heights[iy], radii[ir], stds[iy, ir]
+
+    best_corrected = corrected_for_positions(angles, measured_px, [best_y], [best_radius],
+                                             camera_matrix, dist_coeffs)[0, 0]
+    return best_corrected, best_y, best_std
 
 # Применяем оптимизированную коррекцию
 corrected_px_optimized, best_y, best_std = find_optimal_correction(angles, measured_px, camera_matrix, dist_coeffs)
@@ -116,13 +151,7 @@ def simple_center_correction(measured_px, camera_matrix, dist_coeffs):
     Корректирует расстояния, предполагая что точки в центре кадра
     """
     center_x, center_y = camera_matrix[0, 2], camera_matrix[1, 2]
-    corrected_distances = []
-    
-    for dist_px in measured_px:
-        corrected_dist = correct_measured_distance(dist_px, center_x, center_y, camera_matrix, dist_coeffs)
-        corrected_distances.append(corrected_dist)
-    
-    return np.array(corrected_distances)
+    return correct_measured_distance(measured_px, center_x, center_y, camera_matrix, dist_coeffs)
 
 # Коррекция для центра кадра
 corrected_center = simple_center_correction(measured_px, camera_matrix, dist_coeffs)
@@ -201,7 +230,7 @@ improvement = (np.std(measured_px) - np.std(corrected_px_optimized)) / np.std(me
 print(f"\nУЛУЧШЕНИЕ ТОЧНОСТИ: {improvement:.1f}%")
 print(f"Коэффициент улучшения: {np.std(measured_px)/np.std(corrected_px_optimized):.1f}x")
 
-print(f"\nОптимальная высота точек: {best_y} px")
+print(f"\nОптимальная высота точек: {best_y:.1f} px")
 
 # Проверяем, достигли ли мы целевой точности 2-3 пикселя
 target_std = 2.5
@@ -1,8 +1,18 @@
+import os
+import sys
+
 import cv2
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
 
+# angle_corrector.py лежит в корне репозитория
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from angle_corrector import AngleCorrector
+
+# Куда сохранить корректор (JSON для приложения и для AngleCorrector.load)
+CORRECTOR_PATH = "angle_corrector.json"
+
 # Данные замеров
 angles = np.array([
     -0.5931069572, -0.5843231693, -0.5754001662, -0.5657200862, -0.5500896729,
@@ -170,19 +180,17 @@ print(f"Относительная ошибка: {np.std(corrected_px_interp)/tr
 
 # 7. ФУНКЦИЯ ДЛЯ ПРАКТИЧЕСКОГО ИСПОЛЬЗОВАНИЯ
 def create_distortion_corrector(angles_calib, measurements_calib):
-    """Создает функцию коррекции на основе калибровочных данных"""
-    true_dist = np.median(measurements_calib[np.abs(angles_calib) < 0.1])
-    interp_func = interp1d(angles_calib, true_dist/measurements_calib, 
-                          kind='cubic', fill_value="extrapolate")
-    
-    def correct_measurement(angle, measured_px):
-        correction = interp_func(angle)
-        return measured_px * correction
-    
-    return correct_measurement, true_dist
+    """
+    Создает корректор на основе калибровочных данных: тот же кубический сплайн,
+    что interp1d(kind='cubic'), но его можно сохранить и загрузить без SciPy
+    """
+    corrector = AngleCorrector.fit(angles_calib, measurements_calib)
+    return corrector, corrector.true_distance
 
 # Создаем корректор
 distortion_corrector, true_dist = create_distortion_corrector(angles, measured_px)
+distortion_corrector.save(CORRECTOR_PATH)
+print(f"\nКорректор сохранен в {CORRECTOR_PATH}")
 
 # Пример использования
 test_angle = -0.5
@@ -208,6 +216,6 @@ for method_name, corrected_data in [("Полином", corrected_px_poly),
 
 print(f"\nРЕКОМЕНДАЦИИ:")
 print("1. Используйте интерполяционный метод для коррекции")
-print("2. Для новых измерений используйте функцию distortion_corrector()")
+print(f"2. Для новых измерений используйте distortion_corrector() или AngleCorrector.load('{CORRECTOR_PATH}')")
 print("3. Периодически перекалибруйте систему")
 print("4. Рассмотрите использование более качественного объектива")
\ No newline at end of file
@@ -2,70 +2,374 @@ import cv2
 import numpy as np
 import glob
 import os
+import argparse
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from corner_cache import CornerCache, file_hash, make_key
+from image_loader import load_color, load_gray, reduce_factor
 
 # === ПАРАМЕТРЫ КАЛИБРОВОЧНОЙ ДОСКИ ===
 # Количество пересечений внутренних углов (не квадратов!)
 CHESSBOARD_SIZE = (8, 6)  # 9x6 часто стандарт
 SQUARE_SIZE = 25.0  # мм (укажи реальный размер клетки)
 
+# Параметры уточнения углов (cornerSubPix)
+SUBPIX_WIN = (11, 11)
+SUBPIX_CRITERIA = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+
+# Масштаб изображения для грубого поиска доски (1.0 — поиск на полном разрешении).
+# Найденные углы переносятся на полное разрешение и уточняются cornerSubPix.
+DETECT_SCALE = 1.0
+
 # === ПУТИ ===
 images_dir = "camera_calibrate/4_nov"
-pattern = os.path.join(images_dir, "*.jpg")
-
-# === МАССИВЫ ДЛЯ ТОЧЕК ===
-obj_points = []  # 3D точки в реальном пространстве
-img_points = []  # 2D точки на изображении
-
-# Подготовим объектные точки (0,0,0), (1,0,0), (2,0,0) ... масштабированные
-objp = np.zeros((CHESSBOARD_SIZE[0]*CHESSBOARD_SIZE[1], 3), np.float32)
-objp[:, :2] = np.mgrid[0:CHESSBOARD_SIZE[0], 0:CHESSBOARD_SIZE[1]].T.reshape(-1, 2)
-objp *= SQUARE_SIZE
-
-# === ОБРАБОТКА ИЗОБРАЖЕНИЙ ===
-images = glob.glob(pattern)
-print(f"Найдено {len(images)} изображений")
-
-for fname in images:
-    img = cv2.imread(fname)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-    # Поиск углов
-    ret, corners = cv2.findChessboardCorners(gray, CHESSBOARD_SIZE, None)
-
-    if ret:
-        # Уточнение координат углов
-        corners2 = cv2.cornerSubPix(
-            gray, corners, (11, 11), (-1, -1),
-            (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-        )
-        obj_points.append(objp)
-        img_points.append(corners2)
-
-        # Отрисовка найденных углов
-        cv2.drawChessboardCorners(img, CHESSBOARD_SIZE, corners2, ret)
-        cv2.imshow('Chessboard', img)
-        cv2.waitKey(200)
+
+# === ПАРАЛЛЕЛЬНАЯ ОБРАБОТКА ===
+# Количество процессов для поиска углов (None — по числу ядер)
+WORKERS = None
+
+# === ВИЗУАЛИЗАЦИЯ ===
+# HEADLESS = True — без окон OpenCV (сборочные серверы, ssh)
+HEADLESS = False
+# Папка для превью с отрисованными углами (None — не сохранять)
+PREVIEW_DIR = None
+# Во сколько раз уменьшать сохраняемые превью (1, 2, 4 или 8)
+PREVIEW_REDUCE = 2
+
+# === КЭШ УГЛОВ ===
+# Найденные углы сохраняются в corners_cache.npz в папке со снимками
+USE_CACHE = True
+
+
+def make_object_points(chessboard_size=CHESSBOARD_SIZE, square_size=SQUARE_SIZE):
+    """Объектные точки (0,0,0), (1,0,0), (2,0,0) ... масштабированные"""
+    objp = np.zeros((chessboard_size[0]*chessboard_size[1], 3), np.float32)
+    objp[:, :2] = np.mgrid[0:chessboard_size[0], 0:chessboard_size[1]].T.reshape(-1, 2)
+    objp *= square_size
+    return objp
+
+
+def _init_worker():
+    # Каждый процесс работает в один поток, иначе потоки OpenCV
+    # конкурируют между процессами за одни и те же ядра
+    cv2.setNumThreads(1)
+
+
+def search_board(gray, chessboard_size=CHESSBOARD_SIZE, scale=DETECT_SCALE):
+    """
+    Грубый поиск доски, при scale < 1 — на уменьшенной копии.
+    Возвращает неуточненные углы в координатах gray или None.
+    """
+    if scale < 1.0:
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        ret, corners = cv2.findChessboardCorners(small, chessboard_size, None)
+        if ret:
+            corners = upscale_corners(corners, scale)
+    else:
+        ret, corners = cv2.findChessboardCorners(gray, chessboard_size, None)
+    return corners if ret else None
+
+
+def upscale_corners(corners, scale):
+    """Перевод координат центров пикселей из уменьшенного изображения в полное разрешение"""
+    return ((corners + 0.5) / scale - 0.5).astype(np.float32)
+
+
+def refine_corners(gray, corners):
+    """Уточнение координат углов на полном разрешении"""
+    return cv2.cornerSubPix(gray, corners, SUBPIX_WIN, (-1, -1), SUBPIX_CRITERIA)
+
+
+def find_corners(gray, chessboard_size=CHESSBOARD_SIZE, scale=DETECT_SCALE):
+    """
+    Грубый поиск доски на уменьшенной копии и уточнение на полном разрешении.
+    Возвращает уточненные углы или None.
+    """
+    corners = search_board(gray, chessboard_size, scale)
+    if corners is None:
+        return None
+    return refine_corners(gray, corners)
+
+
+def detect_corners(fname, chessboard_size=CHESSBOARD_SIZE, scale=DETECT_SCALE, store=None):
+    """
+    Ищет и уточняет углы доски на одном изображении.
+    Возвращает (fname, image_size, corners) — corners равен None, если доска не найдена.
+    Если store (FrameStore) передан, декодированные кадры берутся из него.
+    """
+    load = store.gray if store is not None else load_gray
+    factor = reduce_factor(scale)
+    if factor == 1:
+        gray = load(fname)
+        return fname, gray.shape[::-1], find_corners(gray, chessboard_size, scale)
+
+    # Грубый поиск на кадре, уменьшенном еще при декодировании JPEG.
+    # Полное разрешение декодируется только для кадров, где доска найдена.
+    small = load(fname, factor)
+    corners = search_board(small, chessboard_size, scale * factor)
+    if corners is None:
+        # Размер полного кадра неизвестен без его декодирования; для калибровки он не нужен
+        return fname, None, None
+    gray = load(fname)
+    return fname, gray.shape[::-1], refine_corners(gray, upscale_corners(corners, 1.0 / factor))
+
+
+def detection_key(fname, chessboard_size=CHESSBOARD_SIZE, scale=DETECT_SCALE):
+    """Ключ кэша: содержимое файла и все параметры, влияющие на углы"""
+    return make_key(file_hash(fname), tuple(chessboard_size), SUBPIX_WIN, SUBPIX_CRITERIA, scale)
+
+
+def make_pool(workers=WORKERS):
+    """Пул процессов для поиска углов (можно переиспользовать между наборами)"""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def detect_all(images, chessboard_size=CHESSBOARD_SIZE, workers=WORKERS, cache=None,
+               scale=DETECT_SCALE, store=None, pool=None):
+    """
+    Запускает detect_corners для всех изображений в пуле процессов.
+    Результаты возвращаются в том же порядке, что и images.
+    Если передан cache (CornerCache), изображения из кэша не декодируются.
+    Если передан pool, используется он, иначе создается временный пул.
+    """
+    results = [None] * len(images)
+    keys = [None] * len(images)
+    pending = []
+    for i, fname in enumerate(images):
+        if cache is not None:
+            keys[i] = detection_key(fname, chessboard_size, scale)
+            hit = cache.get(keys[i])
+            if hit is not None:
+                results[i] = (fname,) + hit
+                continue
+        pending.append(i)
+
+    if cache is not None:
+        print(f"Кэш углов: {len(images) - len(pending)} из {len(images)} изображений")
+
+    todo = [images[i] for i in pending]
+    args = (todo, repeat(chessboard_size), repeat(scale), repeat(store))
+    if not todo:
+        detected = []
+    elif pool is not None:
+        detected = list(pool.map(detect_corners, *args))
+    elif workers == 1 or len(todo) == 1:
+        detected = list(map(detect_corners, *args))
     else:
-        print(f"⚠️ Углы не найдены на {fname}")
+        with make_pool(workers) as tmp_pool:
+            detected = list(tmp_pool.map(detect_corners, *args))
+
+    for i, result in zip(pending, detected):
+        results[i] = result
+        if cache is not None:
+            _, image_size, corners = result
+            cache.put(keys[i], image_size, corners)
+
+    if cache is not None:
+        cache.save()
+    return results
+
+
+def find_images(images_dir):
+    """Снимки набора; сортируем, чтобы порядок видов (и rvecs/tvecs) не зависел от файловой системы"""
+    return sorted(glob.glob(os.path.join(images_dir, "*.jpg")))
+
+
+def calibrate(obj_points, img_points, image_size, camera_matrix=None, dist_coeffs=None, flags=0):
+    """Обертка над cv2.calibrateCamera: (rms, camera_matrix, dist_coeffs, rvecs, tvecs)"""
+    return cv2.calibrateCamera(obj_points, img_points, image_size, camera_matrix, dist_coeffs,
+                               flags=flags)
+
+
+def save_calibration(path, camera_matrix, dist_coeffs, rvecs, tvecs, image_size=None,
+                     img_points=None, fnames=None, excluded_fnames=None, view_keys=None,
+                     excluded_keys=None):
+    """
+    Сохраняет результат в .npz. Кроме параметров камеры сохраняются размер кадра,
+    углы и имена снимков — по ним калибровку можно продолжить без повторного поиска углов.
+    excluded_fnames — снимки, отброшенные отбором видов: при продолжении их не добавляют.
+    view_keys/excluded_keys — ключи тех же снимков по содержимому (incremental_calibration.py).
+    """
+    extra = {}
+    if image_size is not None:
+        extra['image_width'], extra['image_height'] = image_size
+    if img_points is not None:
+        extra['img_points'] = np.asarray([np.reshape(c, (-1, 2)) for c in img_points], np.float32)
+    if fnames is not None:
+        extra['fnames'] = np.asarray(fnames)
+    if excluded_fnames is not None:
+        extra['excluded_fnames'] = np.asarray(excluded_fnames, dtype=str)
+    if view_keys is not None:
+        extra['view_keys'] = np.asarray(view_keys, dtype=str)
+    if excluded_keys is not None:
+        extra['excluded_keys'] = np.asarray(excluded_keys, dtype=str)
+    np.savez(path,
+             camera_matrix=camera_matrix,
+             dist_coeffs=dist_coeffs,
+             rvecs=rvecs,
+             tvecs=tvecs,
+             **extra)
+
+
+def draw_corners(fname, corners, chessboard_size=CHESSBOARD_SIZE, reduce=1):
+    """Изображение с отрисованными углами, при reduce > 1 — уменьшенное"""
+    img = load_color(fname, reduce)
+    if reduce > 1:
+        corners = ((corners + 0.5) / reduce - 0.5).astype(np.float32)
+    cv2.drawChessboardCorners(img, chessboard_size, corners, True)
+    return img
+
+
+def show_corners(fname, corners, chessboard_size=CHESSBOARD_SIZE):
+    """Отрисовка найденных углов в окне"""
+    cv2.imshow('Chessboard', draw_corners(fname, corners, chessboard_size))
+    cv2.waitKey(200)
+
+
+class PreviewWriter:
+    """
+    Сохраняет превью с углами в фоновом потоке, чтобы запись
+    файлов не задерживала калибровку.
+    """
+
+    def __init__(self, out_dir, chessboard_size=CHESSBOARD_SIZE, reduce=PREVIEW_REDUCE):
+        self.out_dir = out_dir
+        self.chessboard_size = chessboard_size
+        self.reduce = reduce
+        os.makedirs(out_dir, exist_ok=True)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, fname, corners):
+        self._queue.put((fname, corners))
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            fname, corners = item
+            out_path = os.path.join(self.out_dir, os.path.basename(fname))
+            try:
+                cv2.imwrite(out_path, draw_corners(fname, corners, self.chessboard_size, self.reduce))
+            except cv2.error as e:
+                print(f"⚠️ Не удалось сохранить превью {out_path}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Калибровка камеры по снимкам шахматной доски")
+    parser.add_argument("--images-dir", default=images_dir, help="папка со снимками *.jpg")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="количество процессов")
+    parser.add_argument("--headless", action="store_true", default=HEADLESS,
+                        help="не открывать окна OpenCV")
+    parser.add_argument("--preview-dir", default=PREVIEW_DIR,
+                        help="сохранять превью с углами в эту папку")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false", default=USE_CACHE,
+                        help="не использовать кэш найденных углов")
+    parser.add_argument("--scale", type=float, default=DETECT_SCALE,
+                        help="масштаб для грубого поиска доски, например 0.25")
+    parser.add_argument("--robust", action="store_true",
+                        help="отбраковать виды с большой ошибкой репроекции")
+    parser.add_argument("--max-views", type=int, default=None,
+                        help="выбрать не больше N разнообразных видов (включает --robust)")
+    parser.add_argument("--report", default="calibration_report.json",
+                        help="JSON с ошибками по видам для --robust")
+    parser.add_argument("--device", default=None,
+                        help="модель телефона: сохранить результат еще и в реестр калибровок")
+    parser.add_argument("--camera-id", default="0",
+                        help="id камеры, как в CameraFocalLength (0 — основная, 1 — фронтальная)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    objp = make_object_points()
+
+    # === МАССИВЫ ДЛЯ ТОЧЕК ===
+    obj_points = []  # 3D точки в реальном пространстве
+    img_points = []  # 2D точки на изображении
+    used_images = []  # снимки, на которых найдена доска
+    excluded = None  # снимки, отброшенные --robust/--max-views
+
+    # === ОБРАБОТКА ИЗОБРАЖЕНИЙ ===
+    images = find_images(args.images_dir)
+    print(f"Найдено {len(images)} изображений")
+
+    preview = PreviewWriter(args.preview_dir) if args.preview_dir else None
+    cache = CornerCache.for_dataset(args.images_dir) if args.use_cache else None
+
+    image_size = None
+    for fname, size, corners2 in detect_all(images, workers=args.workers, cache=cache,
+                                            scale=args.scale):
+        if corners2 is not None:
+            image_size = size
+            obj_points.append(objp)
+            img_points.append(corners2)
+            used_images.append(fname)
+            if preview:
+                preview.put(fname, corners2)
+            if not args.headless:
+                show_corners(fname, corners2)
+        else:
+            print(f"⚠️ Углы не найдены на {fname}")
+
+    if not args.headless:
+        cv2.destroyAllWindows()
+
+    # === КАЛИБРОВКА ===
+    print("\nВыполняется калибровка...")
+    if args.robust or args.max_views:
+        # Импорт здесь: view_selection сам импортирует cc
+        from view_selection import excluded_fnames, robust_calibrate, save_report
+        ret, camera_matrix, dist_coeffs, rvecs, tvecs, report = robust_calibrate(
+            objp, img_points, image_size, used_images, args.max_views)
+        excluded = excluded_fnames(report)
+        selected = set(report['selected'])
+        img_points = [c for c, f in zip(img_points, used_images) if f in selected]
+        used_images = report['selected']
+        save_report(args.report, report)
+        print(f"Отбраковано видов: {len(report['rejected'])}, использовано: {len(used_images)}")
+        print(f"Ошибки по видам сохранены в {args.report}")
+    else:
+        ret, camera_matrix, dist_coeffs, rvecs, tvecs = calibrate(obj_points, img_points, image_size)
+
+    print("\n=== РЕЗУЛЬТАТЫ ===")
+    print("RMS ошибка:", ret)
+    print("Матрица камеры:\n", camera_matrix)
+    print("Коэффициенты дисторсии:\n", dist_coeffs.ravel())
+
+    # === СОХРАНЕНИЕ ===
+    save_calibration("calibration_data.npz", camera_matrix, dist_coeffs, rvecs, tvecs,
+                     image_size, img_points, used_images, excluded)
 
-cv2.destroyAllWindows()
+    print("\n✅ Калибровка завершена. Результаты сохранены в calibration_data.npz")
 
-# === КАЛИБРОВКА ===
-print("\nВыполняется калибровка...")
-ret, camera_matrix, dist_coeffs, rvecs, tvecs = cv2.calibrateCamera(
-    obj_points, img_points, gray.shape[::-1], None, None
-)
+    if args.device:
+        from calibration_registry import CalibrationRegistry
+        registry = CalibrationRegistry()
+        key = registry.add(args.device, args.camera_id, camera_matrix, dist_coeffs, image_size,
+                           rvecs, tvecs, rms=ret)
+        registry.save()
+        print(f"Калибровка добавлена в реестр: {key}")
 
-print("\n=== РЕЗУЛЬТАТЫ ===")
-print("RMS ошибка:", ret)
-print("Матрица камеры:\n", camera_matrix)
-print("Коэффициенты дисторсии:\n", dist_coeffs.ravel())
+    if preview:
+        preview.close()
+        print(f"Превью сохранены в {args.preview_dir}")
 
-# === СОХРАНЕНИЕ ===
-np.savez("calibration_data.npz",
-         camera_matrix=camera_matrix,
-         dist_coeffs=dist_coeffs,
-         rvecs=rvecs,
-         tvecs=tvecs)
 
-print("\n✅ Калибровка завершена. Результаты сохранены в calibration_data.npz")
+if __name__ == "__main__":
+    main()
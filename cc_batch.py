@@ -0,0 +1,118 @@
+# cc_batch.py
+# Калибровка всех сессий съемки одной командой с общим пулом процессов и кэшем углов.
+import argparse
+import csv
+import glob
+import os
+import time
+
+import cc
+from corner_cache import CornerCache
+from view_selection import excluded_fnames, robust_calibrate, save_report
+
+CALIBRATE_ROOT = "camera_calibrate"
+OUTPUT_DIR = "calibration_results"
+
+SUMMARY_FIELDS = ["session", "images", "views", "rms",
+                  "fx", "fy", "cx", "cy", "k1", "k2", "p1", "p2", "k3", "seconds"]
+
+
+def find_sessions(root=CALIBRATE_ROOT):
+    """Сессии — папки со снимками *.jpg (включая сам root, если снимки лежат в нем)"""
+    dirs = [root] + sorted(d for d in glob.glob(os.path.join(root, "*")) if os.path.isdir(d))
+    return [d for d in dirs if cc.find_images(d)]
+
+
+def session_name(images_dir, root=CALIBRATE_ROOT):
+    rel = os.path.relpath(images_dir, root)
+    return os.path.basename(os.path.normpath(root)) if rel == "." else rel.replace(os.sep, "_")
+
+
+def calibrate_session(images_dir, pool, args):
+    """Поиск углов и калибровка одной сессии; возвращает строку сводной таблицы"""
+    start = time.perf_counter()
+    images = cc.find_images(images_dir)
+    cache = CornerCache.for_dataset(images_dir) if args.use_cache else None
+    results = cc.detect_all(images, cache=cache, scale=args.scale, pool=pool)
+
+    found = [(fname, size, corners) for fname, size, corners in results if corners is not None]
+    if len(found) < 3:
+        print(f"⚠️ {images_dir}: доска найдена только на {len(found)} снимках, пропускаем")
+        return None
+
+    objp = cc.make_object_points()
+    fnames = [f for f, _, _ in found]
+    img_points = [c for _, _, c in found]
+    image_size = found[0][1]
+
+    name = session_name(images_dir, args.root)
+    excluded = None
+    if args.robust or args.max_views:
+        rms, K, D, rvecs, tvecs, report = robust_calibrate(objp, img_points, image_size, fnames,
+                                                           args.max_views)
+        selected = set(report['selected'])
+        img_points = [c for c, f in zip(img_points, fnames) if f in selected]
+        fnames = report['selected']
+        excluded = excluded_fnames(report)
+        save_report(os.path.join(args.output, f"{name}_report.json"), report)
+    else:
+        rms, K, D, rvecs, tvecs = cc.calibrate([objp] * len(img_points), img_points, image_size)
+
+    cc.save_calibration(os.path.join(args.output, f"{name}.npz"), K, D, rvecs, tvecs,
+                        image_size, img_points, fnames, excluded)
+
+    d = D.ravel()
+    return {
+        "session": name, "images": len(images), "views": len(fnames), "rms": rms,
+        "fx": K[0, 0], "fy": K[1, 1], "cx": K[0, 2], "cy": K[1, 2],
+        "k1": d[0], "k2": d[1], "p1": d[2], "p2": d[3], "k3": d[4],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def print_summary(rows):
+    print(f"\n{'сессия':<12}{'видов':>8}{'RMS':>8}{'fx':>9}{'fy':>9}{'cx':>8}{'cy':>8}"
+          f"{'k1':>9}{'k2':>9}{'p1':>9}{'p2':>9}{'k3':>9}")
+    for r in rows:
+        print(f"{r['session']:<12}{r['views']:>4}/{r['images']:<3}{r['rms']:>8.3f}"
+              f"{r['fx']:>9.1f}{r['fy']:>9.1f}{r['cx']:>8.1f}{r['cy']:>8.1f}"
+              f"{r['k1']:>9.4f}{r['k2']:>9.4f}{r['p1']:>9.4f}{r['p2']:>9.4f}{r['k3']:>9.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Калибровка всех сессий в camera_calibrate")
+    parser.add_argument("sessions", nargs="*", help="папки сессий (по умолчанию — все в --root)")
+    parser.add_argument("--root", default=CALIBRATE_ROOT)
+    parser.add_argument("--output", default=OUTPUT_DIR, help="папка для результатов")
+    parser.add_argument("--workers", type=int, default=cc.WORKERS)
+    parser.add_argument("--scale", type=float, default=cc.DETECT_SCALE)
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false", default=cc.USE_CACHE)
+    parser.add_argument("--robust", action="store_true")
+    parser.add_argument("--max-views", type=int, default=None)
+    args = parser.parse_args()
+
+    sessions = args.sessions or find_sessions(args.root)
+    os.makedirs(args.output, exist_ok=True)
+    print(f"Сессий: {len(sessions)}")
+
+    rows = []
+    with cc.make_pool(args.workers) as pool:
+        for images_dir in sessions:
+            print(f"\n=== {images_dir} ===")
+            row = calibrate_session(images_dir, pool, args)
+            if row:
+                rows.append(row)
+                print(f"RMS {row['rms']:.4f}, видов {row['views']}, {row['seconds']:.1f} с")
+
+    summary_path = os.path.join(args.output, "summary.csv")
+    with open(summary_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print_summary(rows)
+    print(f"\n✅ Результаты сохранены в {args.output}, сводка — {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,16 @@
 # convert_calibration.py
+import argparse
 import numpy as np
 import json
 
+from calibration_bundle import save_bundle
+from calibration_registry import REGISTRY_DIR, CalibrationRegistry
+from remap_tables import write_remap_asset
+
+# Разрешения кадров камеры в приложении (ResolutionPreset.veryHigh и high),
+# для которых заранее строятся таблицы remap
+REMAP_SIZES = [(1920, 1080), (1280, 720)]
+
 def convert_npz_to_json(npz_file_path, json_file_path):
     # Загружаем данные из .npz файла
     data = np.load(npz_file_path)
@@ -26,6 +35,50 @@ def convert_npz_to_json(npz_file_path, json_file_path):
     print(f"Матрица камеры: {camera_matrix}")
     print(f"Коэффициенты дисторсии: {dist_coeffs}")
 
+def export_remap_tables(npz_file_path, output_path, sizes=REMAP_SIZES):
+    """Готовые таблицы remap для приложения (см. remap_tables.py)"""
+    data = np.load(npz_file_path)
+    write_remap_asset(output_path, data['camera_matrix'], data['dist_coeffs'], sizes)
+    print(f"Таблицы remap для {', '.join(f'{w}x{h}' for w, h in sizes)} сохранены в {output_path}")
+
+def convert_npz_to_bundle(npz_file_path, bundle_path, remap_sizes=REMAP_SIZES, lut_step=None):
+    """Бинарный пакет калибровки (см. calibration_bundle.py) вместе с rvecs/tvecs и таблицами remap"""
+    data = np.load(npz_file_path)
+    image_size = None
+    if 'image_width' in data:
+        image_size = (int(data['image_width']), int(data['image_height']))
+    save_bundle(bundle_path, data['camera_matrix'], data['dist_coeffs'], image_size,
+                data['rvecs'] if 'rvecs' in data else None,
+                data['tvecs'] if 'tvecs' in data else None,
+                remap_sizes, lut_step)
+    print(f"Пакет калибровки сохранен в {bundle_path}")
+
+def export_registry(manifest_path, registry_root=REGISTRY_DIR, remap_sizes=REMAP_SIZES):
+    """
+    Пакеты для всех устройств из манифеста за один проход и общий индекс реестра.
+    Манифест — JSON-список записей {"device", "camera_id", "npz"[, "width", "height"]}.
+    """
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    registry = CalibrationRegistry(registry_root)
+    for item in manifest:
+        image_size = (item['width'], item['height']) if 'width' in item else None
+        key = registry.add_npz(item['device'], item.get('camera_id', "0"), item['npz'],
+                               image_size, remap_sizes)
+        print(f"{key} <- {item['npz']}")
+    registry.save()
+    print(f"Реестр {registry_root}: {len(registry)} калибровок")
+
 # Использование
 if __name__ == "__main__":
-    convert_npz_to_json('calibration_data.npz', 'assets/calibration_data.json')
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Экспорт калибровки для приложения")
+    parser.add_argument("--manifest", help="JSON со списком устройств для реестра калибровок")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    args = parser.parse_args()
+
+    if args.manifest:
+        export_registry(args.manifest, args.registry)
+    else:
+        convert_npz_to_json('calibration_data.npz', 'assets/calibration_data.json')
+        export_remap_tables('calibration_data.npz', 'assets/undistort_maps.bin')
+        convert_npz_to_bundle('calibration_data.npz', 'calibration_data.calib')
\ No newline at end of file
@@ -0,0 +1,93 @@
+# corner_cache.py
+import hashlib
+import os
+
+import numpy as np
+
+# Имя файла кэша внутри папки с набором снимков
+CACHE_FILENAME = "corners_cache.npz"
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-1 содержимого файла (без декодирования JPEG)"""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def make_key(content_hash, *params):
+    """
+    Ключ записи: хэш файла + параметры поиска (размер доски, критерии cornerSubPix и т.д.).
+    При изменении любого параметра ключ меняется и углы ищутся заново.
+    """
+    return hashlib.sha1(repr((content_hash,) + params).encode()).hexdigest()
+
+
+class CornerCache:
+    """
+    Кэш найденных и уточненных углов в .npz рядом с набором снимков.
+    Для каждого ключа хранятся углы (пустой массив — доска не найдена)
+    и размер изображения, чтобы повторная калибровка обходилась без imread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        self._dirty = False
+        if os.path.exists(path):
+            self._load()
+
+    @classmethod
+    def for_dataset(cls, images_dir):
+        return cls(os.path.join(images_dir, CACHE_FILENAME))
+
+    def _load(self):
+        try:
+            with np.load(self.path) as data:
+                for name in data.files:
+                    if name.startswith('c_'):
+                        key = name[2:]
+                        self._entries[key] = (data['c_' + key], tuple(int(v) for v in data['s_' + key]))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Кэш углов {self.path} поврежден и будет пересоздан: {e}")
+            self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Возвращает (image_size, corners) или None; corners равен None, если доска не найдена"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        corners, image_size = entry
+        if not len(corners):
+            return (image_size if any(image_size) else None), None
+        return image_size, corners
+
+    def put(self, key, image_size, corners):
+        if corners is None:
+            corners = np.empty((0, 2), np.float32)
+        if image_size is None:
+            # Для кадров без доски размер может быть неизвестен (грубый поиск без полного декодирования)
+            image_size = (0, 0)
+        self._entries[key] = (np.asarray(corners, np.float32), tuple(image_size))
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        arrays = {}
+        for key, (corners, image_size) in self._entries.items():
+            arrays['c_' + key] = corners
+            arrays['s_' + key] = np.array(image_size, np.int32)
+        # Пишем во временный файл и подменяем, чтобы прерванный запуск не испортил кэш
+        tmp_path = self.path + '.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,188 @@
+# corrector_cv.py
+# Сравнение корректоров расстояния по углу (visual_2/visual_4.py, python/c1.py) k-кратной
+# перекрестной проверкой в пуле процессов: ошибка на отложенных замерах,
+# время подбора и время вычисления для каждой модели.
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+import cc
+from angle_corrector import CENTER_ANGLE, AngleCorrector
+from distortion import load_calibration
+
+DATASETS = [os.path.join("python", "с1.txt")]
+FOLDS = 5
+SEED = 0
+# Сколько углов передавать модели при замере скорости вычисления
+EVAL_POINTS = 100_000
+# Радиус смещения точек от центра кадра в физической модели (как в visual_2.py)
+POINT_RADIUS = 1500
+CALIBRATION = "calibration_data.npz"
+
+
+def load_dataset(path):
+    """Текстовый файл с двумя столбцами: угол (рад) и расстояние (px)"""
+    data = np.loadtxt(path, dtype=np.float64)
+    return data[:, 0], data[:, 1]
+
+
+def true_distance(angles, measured):
+    """Истинное расстояние — медиана замеров вблизи центра кадра, как в visual_4.py"""
+    center = np.abs(angles) < CENTER_ANGLE
+    return np.median(measured[center] if center.any() else measured)
+
+
+# Каждая модель: fit(angles, measured, target, calibration) -> predict(angles, measured),
+# predict возвращает исправленные px. target — истинное расстояние по обучающей части,
+# calibration — (K, D) для физической модели.
+
+def fit_polynomial(degree):
+    def fit(angles, measured, target, calibration):
+        coeffs = np.polyfit(angles, target / measured, degree)
+        return lambda a, m: m * np.polyval(coeffs, a)
+    return fit
+
+
+def fit_cubic_interpolation(angles, measured, target, calibration):
+    corrector = AngleCorrector.fit(angles, measured)
+    factor_scale = target / corrector.true_distance
+    return lambda a, m: corrector(a, m) * factor_scale
+
+
+def fit_linear_interpolation(angles, measured, target, calibration):
+    order = np.argsort(angles)
+    x, y = angles[order], (target / measured)[order]
+    return lambda a, m: m * np.interp(a, x, y)
+
+
+def fit_smoothing_spline(angles, measured, target, calibration):
+    from scipy.interpolate import UnivariateSpline
+    order = np.argsort(angles)
+    # Допустимая сумма квадратов невязок: шум коэффициента ~0.1% на замер
+    spline = UnivariateSpline(angles[order], (target / measured)[order], k=3, s=len(angles) * 1e-6)
+    return lambda a, m: m * spline(a)
+
+
+def physical_correction(angles, measured, K, D):
+    """Коррекция через cv2.undistortPoints, как correct_distortion_for_points в visual_2.py"""
+    half = measured / 2
+    offset_x = POINT_RADIUS * np.sin(angles)
+    offset_y = POINT_RADIUS * np.cos(angles)
+    points = np.empty((len(angles), 2, 2), dtype=np.float32)
+    points[:, 0, 0] = K[0, 2] - half + offset_x
+    points[:, 1, 0] = K[0, 2] + half + offset_x
+    points[:, :, 1] = (K[1, 2] + offset_y)[:, None]
+    corrected = cv2.undistortPoints(points.reshape(-1, 1, 2), K, D, P=K).reshape(-1, 2, 2)
+    return np.linalg.norm(corrected[:, 0] - corrected[:, 1], axis=1)
+
+
+def fit_physical(angles, measured, target, calibration):
+    K, D = calibration
+    # Единственный свободный параметр — масштаб к истинному расстоянию
+    scale = np.median(target / physical_correction(angles, measured, K, D))
+    return lambda a, m: scale * physical_correction(a, m, K, D)
+
+
+MODELS = {
+    "poly3": fit_polynomial(3),           # python/c1.py
+    "poly5": fit_polynomial(5),           # distortion_model из visual_4.py
+    "linear": fit_linear_interpolation,
+    "cubic": fit_cubic_interpolation,     # interp1d(kind='cubic') из visual_4.py
+    "smooth": fit_smoothing_spline,
+    "physical": fit_physical,             # visual_2.py
+}
+
+
+def k_folds(n, folds=FOLDS, seed=SEED):
+    """Индексы отложенных замеров для каждого прохода"""
+    return np.array_split(np.random.default_rng(seed).permutation(n), folds)
+
+
+def run_fold(model, angles, measured, test_index, calibration):
+    """Подбор на обучающей части и ошибки на отложенной; выполняется в процессе пула"""
+    train = np.ones(len(angles), bool)
+    train[test_index] = False
+    target = true_distance(angles[train], measured[train])
+
+    start = time.perf_counter()
+    predict = MODELS[model](angles[train], measured[train], target, calibration)
+    fit_time = time.perf_counter() - start
+
+    errors = predict(angles[test_index], measured[test_index]) - target
+
+    rng = np.random.default_rng(SEED)
+    eval_angles = rng.uniform(angles.min(), angles.max(), EVAL_POINTS)
+    eval_measured = rng.uniform(measured.min(), measured.max(), EVAL_POINTS)
+    start = time.perf_counter()
+    predict(eval_angles, eval_measured)
+    eval_time = time.perf_counter() - start
+    return model, errors, fit_time, eval_time
+
+
+def cross_validate(angles, measured, models=None, folds=FOLDS, calibration=None, pool=None):
+    """Сводка по моделям: RMS и максимум ошибки на отложенных замерах, время подбора и вычисления"""
+    models = models or list(MODELS)
+    tasks = [(model, test) for model in models for test in k_folds(len(angles), folds)]
+    if pool is None:
+        results = [run_fold(m, angles, measured, t, calibration) for m, t in tasks]
+    else:
+        results = pool.map(run_fold, *zip(*[(m, angles, measured, t, calibration) for m, t in tasks]))
+
+    summary = {m: {'errors': [], 'fit': [], 'eval': []} for m in models}
+    for model, errors, fit_time, eval_time in results:
+        summary[model]['errors'].append(errors)
+        summary[model]['fit'].append(fit_time)
+        summary[model]['eval'].append(eval_time)
+
+    rows = []
+    for model, s in summary.items():
+        errors = np.concatenate(s['errors'])
+        rows.append({
+            'model': model,
+            'rms': float(np.sqrt(np.mean(errors ** 2))),
+            'max': float(np.max(np.abs(errors))),
+            'fit_ms': float(np.median(s['fit']) * 1e3),
+            'eval_ns': float(np.median(s['eval']) / EVAL_POINTS * 1e9),
+        })
+    return rows
+
+
+def print_table(name, rows):
+    print(f"\n=== {name} ===")
+    print(f"{'модель':<10}{'RMS, px':>10}{'макс, px':>10}{'подбор, мс':>12}{'нс/замер':>10}")
+    for r in sorted(rows, key=lambda r: r['rms']):
+        print(f"{r['model']:<10}{r['rms']:>10.3f}{r['max']:>10.3f}{r['fit_ms']:>12.2f}{r['eval_ns']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Перекрестная проверка корректоров расстояния по углу")
+    parser.add_argument("datasets", nargs="*", default=DATASETS,
+                        help="файлы с замерами: угол (рад) и расстояние (px) в двух столбцах")
+    parser.add_argument("--folds", type=int, default=FOLDS)
+    parser.add_argument("--models", nargs="+", choices=list(MODELS), default=list(MODELS))
+    parser.add_argument("--calibration", default=CALIBRATION, help="калибровка для модели physical")
+    parser.add_argument("--workers", type=int, default=cc.WORKERS)
+    parser.add_argument("--output", default=None, help="сохранить сводку в JSON")
+    args = parser.parse_args()
+
+    calibration = load_calibration(args.calibration)
+    report = {}
+    with cc.make_pool(args.workers) as pool:
+        for path in args.datasets:
+            angles, measured = load_dataset(path)
+            rows = cross_validate(angles, measured, args.models, args.folds, calibration, pool)
+            print_table(f"{path}: {len(angles)} замеров, {args.folds} проходов", rows)
+            report[path] = rows
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nСводка сохранена в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
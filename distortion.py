@@ -0,0 +1,190 @@
+# distortion.py
+# Модель дисторсии Брауна–Конради (k1, k2, p1, p2, k3), векторизованная на NumPy.
+import json
+
+import numpy as np
+
+
+def split_params(K, D):
+    """fx, fy, cx, cy и k1, k2, p1, p2, k3 из матрицы камеры и коэффициентов дисторсии"""
+    K = np.asarray(K, dtype=np.float64)
+    D = np.zeros(5) if D is None else np.ravel(np.asarray(D, dtype=np.float64))
+    D = np.pad(D[:5], (0, max(0, 5 - D.size)))
+    return (K[0, 0], K[1, 1], K[0, 2], K[1, 2]), tuple(D)
+
+
+def distort_normalized(x, y, D):
+    """Прямая модель дисторсии в нормализованных координатах"""
+    k1, k2, p1, p2, k3 = D
+    r2 = x * x + y * y
+    radial = 1 + r2 * (k1 + r2 * (k2 + r2 * k3))
+    x_dist = x * radial + 2 * p1 * x * y + p2 * (r2 + 2 * x * x)
+    y_dist = y * radial + p1 * (r2 + 2 * y * y) + 2 * p2 * x * y
+    return x_dist, y_dist
+
+
+def distort_points(u, v, K, D):
+    """
+    Применяет дисторсию к идеальным пиксельным координатам.
+    u, v — массивы любой (одинаковой) формы; возвращает (u_dist, v_dist) той же формы.
+    """
+    (fx, fy, cx, cy), D = split_params(K, D)
+    # 1. Нормализация (перевод в "идеальные" координаты)
+    x = (np.asarray(u, dtype=np.float64) - cx) / fx
+    y = (np.asarray(v, dtype=np.float64) - cy) / fy
+    # 2-4. Радиальная и тангенциальная дисторсия
+    x_dist, y_dist = distort_normalized(x, y, D)
+    # 5. Де-нормализация (возврат в пиксельные координаты)
+    return x_dist * fx + cx, y_dist * fy + cy
+
+
+def load_calibration(path):
+    """
+    Матрица камеры и коэффициенты дисторсии из calibration_data.json (формат приложения)
+    или calibration_data.npz (результат cc.py), или пакета .calib (calibration_bundle.py).
+    """
+    if path.endswith('.calib'):
+        from calibration_bundle import CalibrationBundle
+        bundle = CalibrationBundle(path)
+        return bundle.camera_matrix, bundle.dist_coeffs
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return (np.array(data['cameraMatrix'], dtype=np.float64).reshape(3, 3),
+                np.array(data['distortionCoefficients'], dtype=np.float64))
+    with np.load(path) as data:
+        return data['camera_matrix'], data['dist_coeffs'].ravel()
+
+
+def distortion_jacobian(x, y, D):
+    """Частные производные прямой модели по нормализованным x, y"""
+    k1, k2, p1, p2, k3 = D
+    r2 = x * x + y * y
+    radial = 1 + r2 * (k1 + r2 * (k2 + r2 * k3))
+    d_radial = k1 + r2 * (2 * k2 + 3 * k3 * r2)  # d(radial)/d(r2)
+    dxdx = radial + 2 * x * x * d_radial + 2 * p1 * y + 6 * p2 * x
+    dxdy = 2 * x * y * d_radial + 2 * p1 * x + 2 * p2 * y
+    dydy = radial + 2 * y * y * d_radial + 6 * p1 * y + 2 * p2 * x
+    return dxdx, dxdy, dxdy, dydy
+
+
+def newton_undistort(xd, yd, D, x=None, y=None, iterations=5):
+    """
+    Решает distort_normalized(x, y) = (xd, yd) методом Ньютона.
+    Начальное приближение — (x, y), по умолчанию сами искаженные координаты.
+    """
+    x = np.array(xd if x is None else x, dtype=np.float64)
+    y = np.array(yd if y is None else y, dtype=np.float64)
+    for _ in range(iterations):
+        fx, fy = distort_normalized(x, y, D)
+        fx -= xd
+        fy -= yd
+        a, b, c, d = distortion_jacobian(x, y, D)
+        det = a * d - b * c
+        x -= (d * fx - b * fy) / det
+        y -= (a * fy - c * fx) / det
+    return x, y
+
+
+def undistort_points(u, v, K, D, iterations=5):
+    """
+    Обратная дисторсия для массивов пиксельных координат (аналог
+    cv2.undistortPoints(..., P=K)), без таблицы — только метод Ньютона.
+    """
+    (fx, fy, cx, cy), D = split_params(K, D)
+    xd = (np.asarray(u, dtype=np.float64) - cx) / fx
+    yd = (np.asarray(v, dtype=np.float64) - cy) / fy
+    x, y = newton_undistort(xd, yd, D, iterations=iterations)
+    return x * fx + cx, y * fy + cy
+
+
+class UndistortLUT:
+    """
+    Таблица обратной дисторсии: для узлов сетки искаженных пиксельных координат
+    один раз вычисляются неискаженные координаты. Запрос — билинейная интерполяция
+    по таблице и, при refine > 0, несколько итераций Ньютона от этого приближения.
+
+    Для скорости таблица хранится в float32 как коэффициенты билинейного полинома
+    каждой ячейки в пикселях (a + b·tu + c·tv + d·tu·tv по x и y): на точку — одна
+    выборка 8 чисел и несколько умножений, без промежуточных массивов float64.
+    Цена float32 — до ~3e-4 px дополнительной погрешности к ошибке самой таблицы
+    (~1e-3 px при шаге 8); для точных координат нужен refine=1.
+    """
+
+    def __init__(self, K, D, image_size, step=8, margin=64):
+        (self.fx, self.fy, self.cx, self.cy), self.D = split_params(K, D)
+        self.step = step
+        w, h = image_size
+        self.u0 = -margin
+        self.v0 = -margin
+        self.nu = int(np.ceil((w + 2 * margin) / step)) + 1
+        self.nv = int(np.ceil((h + 2 * margin) / step)) + 1
+        gu = self.u0 + step * np.arange(self.nu)
+        gv = self.v0 + step * np.arange(self.nv)
+        uu, vv = np.meshgrid(gu, gv)
+        # На узлах сетки — точное решение (итерации Ньютона до сходимости)
+        x, y = newton_undistort((uu - self.cx) / self.fx, (vv - self.cy) / self.fy, self.D,
+                                iterations=10)
+        self.map_x = x
+        self.map_y = y
+
+        # Коэффициенты ячеек в пикселях: [a, b, c, d] по x и y -> (ячейки, 8)
+        m = np.stack([x * self.fx + self.cx, y * self.fy + self.cy], axis=-1)
+        a = m[:-1, :-1]
+        b = m[:-1, 1:] - a
+        c = m[1:, :-1] - a
+        d = m[1:, 1:] - m[1:, :-1] - b
+        self._cells = np.stack([a, b, c, d], axis=-2).astype(np.float32).reshape(-1, 8)
+
+    def _interpolate(self, u, v):
+        """Неискаженные пиксельные координаты по таблице, float32"""
+        gu = np.array(u, dtype=np.float32)
+        gu -= np.float32(self.u0)
+        gu *= np.float32(1 / self.step)
+        gv = np.array(v, dtype=np.float32)
+        gv -= np.float32(self.v0)
+        gv *= np.float32(1 / self.step)
+        # Точки за пределами таблицы берут крайнюю ячейку (экстраполяция);
+        # отбрасывание дробной части вместо floor: отрицательные все равно уходят в 0
+        iu = gu.astype(np.int32)
+        np.clip(iu, 0, self.nu - 2, out=iu)
+        iv = gv.astype(np.int32)
+        np.clip(iv, 0, self.nv - 2, out=iv)
+        gu -= iu
+        gv -= iv
+        index = iv * np.int32(self.nu - 1)
+        index += iu
+        # Одна выборка коэффициентов ячейки на точку, дальше — операции на месте
+        cell = self._cells.take(index, axis=0).T
+        tuv = gu * gv
+        x = cell[2] * gu
+        x += cell[0]
+        y = cell[3] * gu
+        y += cell[1]
+        for out, ci, cj in ((x, 4, 6), (y, 5, 7)):
+            term = cell[ci] * gv
+            out += term
+            np.multiply(cell[cj], tuv, out=term)
+            out += term
+        return x, y
+
+    def lookup(self, u, v):
+        """Нормализованные неискаженные координаты по таблице (билинейно), float64"""
+        x, y = self._interpolate(np.ravel(u), np.ravel(v))
+        shape = np.shape(u)
+        return ((x - self.cx) / self.fx).reshape(shape), ((y - self.cy) / self.fy).reshape(shape)
+
+    def undistort(self, u, v, refine=0):
+        """
+        Неискаженные пиксельные координаты (как cv2.undistortPoints(..., P=K)).
+        refine — число итераций Ньютона после поиска по таблице. Без refine
+        результат в float32, с refine — в float64.
+        """
+        if not refine:
+            x, y = self._interpolate(np.ravel(u), np.ravel(v))
+            return x.reshape(np.shape(u)), y.reshape(np.shape(v))
+        x, y = self.lookup(u, v)
+        xd = (np.asarray(u, dtype=np.float64) - self.cx) / self.fx
+        yd = (np.asarray(v, dtype=np.float64) - self.cy) / self.fy
+        x, y = newton_undistort(xd, yd, self.D, x, y, iterations=refine)
+        return x * self.fx + self.cx, y * self.fy + self.cy
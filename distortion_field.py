@@ -0,0 +1,153 @@
+# distortion_field.py
+# Поле смещений дисторсии по всему кадру: тепловая карта, максимум, перцентили и
+# радиальный профиль. Заменяет разглядывание comparison_grid.png — десятки калибровок
+# сравниваются за секунды. Результат кэшируется по хэшу калибровки.
+import argparse
+import hashlib
+import json
+import os
+
+import cv2
+import numpy as np
+
+from distortion import distort_points, load_calibration, split_params
+
+# Шаг сетки, на которой считается поле, в пикселях кадра
+FIELD_STEP = 16
+RADIAL_BINS = 32
+PERCENTILES = (50, 95, 99)
+CACHE_DIR = "distortion_fields"
+
+
+def calibration_hash(K, D, image_size, step=FIELD_STEP):
+    """Ключ кэша: параметры камеры, размер кадра и плотность сетки"""
+    (fx, fy, cx, cy), D = split_params(K, D)
+    data = np.array([fx, fy, cx, cy, *D, *image_size, step], dtype=np.float64)
+    return hashlib.sha1(data.tobytes()).hexdigest()
+
+
+def displacement_field(K, D, image_size, step=FIELD_STEP):
+    """
+    Смещения (du, dv) искаженных точек относительно идеальных в узлах сетки с шагом step.
+    Возвращает (u, v, du, dv) — двумерные массивы одной формы.
+    """
+    width, height = image_size
+    u, v = np.meshgrid(np.arange(0, width + 1, step, dtype=np.float64),
+                       np.arange(0, height + 1, step, dtype=np.float64))
+    u_dist, v_dist = distort_points(u, v, K, D)
+    return u, v, u_dist - u, v_dist - v
+
+
+def radial_profile(u, v, magnitude, center, bins=RADIAL_BINS):
+    """Средняя и максимальная величина смещения по кольцам радиуса от центра (cx, cy)"""
+    r = np.hypot(u - center[0], v - center[1]).ravel()
+    index = np.minimum((r / r.max() * bins).astype(np.intp), bins - 1)
+    m = magnitude.ravel()
+    count = np.bincount(index, minlength=bins)
+    mean = np.bincount(index, weights=m, minlength=bins) / np.maximum(count, 1)
+    peak = np.zeros(bins)
+    np.maximum.at(peak, index, m)
+    edges = np.linspace(0, r.max(), bins + 1)
+    return (edges[:-1] + edges[1:]) / 2, mean, peak
+
+
+def analyze(K, D, image_size, step=FIELD_STEP, bins=RADIAL_BINS):
+    """Поле смещений и его статистика одним словарем массивов (удобно для np.savez)"""
+    u, v, du, dv = displacement_field(K, D, image_size, step)
+    magnitude = np.hypot(du, dv)
+    (_, _, cx, cy), _ = split_params(K, D)
+    radius, radial_mean, radial_max = radial_profile(u, v, magnitude, (cx, cy), bins)
+    return {
+        'magnitude': magnitude.astype(np.float32),
+        'du': du.astype(np.float32),
+        'dv': dv.astype(np.float32),
+        'max': magnitude.max(),
+        'mean': magnitude.mean(),
+        'percentiles': np.percentile(magnitude, PERCENTILES),
+        'radius': radius,
+        'radial_mean': radial_mean,
+        'radial_max': radial_max,
+        'step': step,
+    }
+
+
+class FieldCache:
+    """Результаты analyze в .npz по одному файлу на калибровку"""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    def get_or_compute(self, K, D, image_size, step=FIELD_STEP):
+        key = calibration_hash(K, D, image_size, step)
+        path = os.path.join(self.root, key + ".npz")
+        if os.path.exists(path):
+            with np.load(path) as data:
+                return {name: data[name] for name in data.files}
+        result = analyze(K, D, image_size, step)
+        os.makedirs(self.root, exist_ok=True)
+        # Временный файл и подмена, как в CornerCache.save
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, **result)
+        os.replace(tmp_path, path)
+        return result
+
+
+def heatmap(magnitude, image_size, max_value=None):
+    """Цветная тепловая карта величины смещения (BGR) в размере кадра"""
+    max_value = max_value or float(magnitude.max()) or 1.0
+    scaled = np.clip(magnitude / max_value * 255, 0, 255).astype(np.uint8)
+    scaled = cv2.resize(scaled, image_size, interpolation=cv2.INTER_LINEAR)
+    return cv2.applyColorMap(scaled, cv2.COLORMAP_INFERNO)
+
+
+def calibration_size(path, K):
+    """Размер кадра из файла калибровки; если его там нет — по главной точке (2*cx, 2*cy)"""
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            if 'image_width' in data:
+                return int(data['image_width']), int(data['image_height'])
+    elif path.endswith('.json'):
+        # convert_calibration.py пишет 0, если размер кадра неизвестен
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        width, height = int(data.get('imageWidth') or 0), int(data.get('imageHeight') or 0)
+        if width > 0 and height > 0:
+            return width, height
+    elif path.endswith('.calib'):
+        from calibration_bundle import CalibrationBundle
+        size = CalibrationBundle(path).image_size
+        if size:
+            return size
+    return int(round(2 * K[0, 2])), int(round(2 * K[1, 2]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Статистика поля дисторсии для калибровок")
+    parser.add_argument("calibrations", nargs="+", help=".json, .npz или .calib")
+    parser.add_argument("--step", type=int, default=FIELD_STEP, help="шаг сетки в пикселях")
+    parser.add_argument("--size", default=None, help="размер кадра ШxВ, если его нет в файле")
+    parser.add_argument("--heatmap-dir", default=None, help="сохранить тепловые карты в эту папку")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false")
+    args = parser.parse_args()
+
+    cache = FieldCache() if args.use_cache else None
+    if args.heatmap_dir:
+        os.makedirs(args.heatmap_dir, exist_ok=True)
+
+    print(f"{'калибровка':<40}{'размер':>12}{'макс':>9}{'сред':>9}"
+          + "".join(f"{'p' + str(p):>9}" for p in PERCENTILES))
+    for path in args.calibrations:
+        K, D = load_calibration(path)
+        size = tuple(map(int, args.size.split('x'))) if args.size else calibration_size(path, K)
+        result = cache.get_or_compute(K, D, size, args.step) if cache else \
+            analyze(K, D, size, args.step)
+        print(f"{os.path.basename(path):<40}{f'{size[0]}x{size[1]}':>12}"
+              f"{float(result['max']):>9.2f}{float(result['mean']):>9.2f}"
+              + "".join(f"{p:>9.2f}" for p in result['percentiles']))
+        if args.heatmap_dir:
+            name = os.path.basename(path).replace('.', '_') + "_field.png"
+            cv2.imwrite(os.path.join(args.heatmap_dir, name), heatmap(result['magnitude'], size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# grid_render.py
+# Отрисовка сеток сравнения полосами: в памяти одновременно только одна полоса кадра,
+# готовые строки сразу уходят в PNG-кодер. Память не зависит от высоты кадра,
+# поэтому можно рисовать сетки размером с сенсор и больше.
+import struct
+import zlib
+
+import cv2
+import numpy as np
+
+from distortion import distort_points
+
+# Высота полосы в пикселях
+TILE_HEIGHT = 256
+# Полоса рисуется с запасом строк сверху и снизу: OpenCV обрезает отрезки по краю
+# холста, и растеризация обрезанного отрезка может сдвинуться на пиксель.
+# Для отрезков не выше TILE_MARGIN результат совпадает с рисованием на полном холсте.
+TILE_MARGIN = 16
+PNG_COMPRESSION = 6
+
+
+class PNGStreamWriter:
+    """
+    Пишет 8-битный RGB PNG построчно: каждая полоса сжимается и записывается
+    отдельным блоком IDAT, целиком изображение не собирается.
+    """
+
+    def __init__(self, path, width, height, level=PNG_COMPRESSION):
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(level)
+        self._file = open(path, 'wb')
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        # 8 бит на канал, тип цвета 2 (RGB), без чересстрочности
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(kind + data)
+        self._file.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write(self, band):
+        """Дописывает полосу BGR (строки, ширина, 3)"""
+        rows = np.empty((band.shape[0], self.width * 3 + 1), np.uint8)
+        rows[:, 0] = 0  # фильтр None для каждой строки
+        rows[:, 1:] = band[:, :, ::-1].reshape(band.shape[0], -1)
+        data = self._compressor.compress(rows.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+        self.rows_written += band.shape[0]
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.rows_written != self.height:
+            raise ValueError(f"Записано {self.rows_written} строк из {self.height}")
+        self._chunk(b"IDAT", self._compressor.flush())
+        self._chunk(b"IEND", b"")
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+class LineLayer:
+    """
+    Набор ломаных одного цвета, разбитый на отрезки. Для полосы рисуются
+    только отрезки, которые в нее попадают, — работа на полосу не растет с высотой кадра.
+    """
+
+    def __init__(self, lines, color, thickness=1):
+        lines = np.asarray(lines, dtype=np.int32)
+        self.p0 = lines[:, :-1].reshape(-1, 2)
+        self.p1 = lines[:, 1:].reshape(-1, 2)
+        self.y_min = np.minimum(self.p0[:, 1], self.p1[:, 1]) - thickness
+        self.y_max = np.maximum(self.p0[:, 1], self.p1[:, 1]) + thickness
+        self.color = color
+        self.thickness = thickness
+
+    def draw(self, band, y0):
+        y1 = y0 + band.shape[0]
+        mask = (self.y_max >= y0) & (self.y_min < y1)
+        if not mask.any():
+            return
+        offset = np.array([0, y0], np.int32)
+        segments = np.stack([self.p0[mask] - offset, self.p1[mask] - offset], axis=1)
+        cv2.polylines(band, list(segments), False, self.color, self.thickness)
+
+
+def render_band(layers, width, y0, y1, bg_color, margin=TILE_MARGIN):
+    band = np.full((y1 - y0 + 2 * margin, width, 3), bg_color, dtype=np.uint8)
+    for layer in layers:
+        layer.draw(band, y0 - margin)
+    return band[margin:margin + y1 - y0]
+
+
+def render_tiled(path, width, height, layers, bg_color=(255, 255, 255), tile_height=TILE_HEIGHT):
+    """Рисует слои полосами по tile_height строк и сразу пишет их в PNG"""
+    with PNGStreamWriter(path, width, height) as writer:
+        for y0 in range(0, height, tile_height):
+            writer.write(render_band(layers, width, y0, min(y0 + tile_height, height), bg_color))
+
+
+def undistort_tiled(path, width, height, layers, K, D, bg_color=(255, 255, 255),
+                    tile_height=TILE_HEIGHT):
+    """
+    Полосовой аналог cv2.undistort(изображение слоев, K, D): для каждой полосы
+    результата считается своя часть карты remap, а исходная картинка рисуется
+    только в той полосе, откуда эта часть карты берет пиксели.
+    """
+    u = np.arange(width, dtype=np.float64)
+    with PNGStreamWriter(path, width, height) as writer:
+        for y0 in range(0, height, tile_height):
+            y1 = min(y0 + tile_height, height)
+            uu, vv = np.meshgrid(u, np.arange(y0, y1, dtype=np.float64))
+            map_x, map_y = distort_points(uu, vv, K, D)
+            # Строки источника, нужные этой полосе (+1 строка на билинейную интерполяцию)
+            src0 = int(np.clip(np.floor(map_y.min()), 0, height - 1))
+            src1 = int(np.clip(np.ceil(map_y.max()) + 2, src0 + 1, height))
+            source = render_band(layers, width, src0, src1, bg_color)
+            band = cv2.remap(source, map_x.astype(np.float32), (map_y - src0).astype(np.float32),
+                             cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+            writer.write(band)
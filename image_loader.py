@@ -0,0 +1,91 @@
+# image_loader.py
+import hashlib
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+# Флаги декодирования JPEG сразу в оттенки серого с уменьшением в 1, 2, 4, 8 раз.
+# libjpeg уменьшает изображение на этапе IDCT, поэтому это быстрее и экономнее по памяти,
+# чем декодирование в BGR на полном разрешении с последующими cvtColor и resize.
+_GRAY_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def reduce_factor(scale):
+    """Наибольший коэффициент уменьшения при декодировании, не превышающий 1/scale"""
+    factor = 1
+    for f in (2, 4, 8):
+        if scale * f <= 1.0 + 1e-9:
+            factor = f
+    return factor
+
+
+def _imread(fname, flags):
+    img = cv2.imread(fname, flags)
+    if img is None:
+        raise IOError(f"Не удалось прочитать изображение {fname}")
+    return img
+
+
+def load_gray(fname, reduce=1):
+    """Декодирует JPEG сразу в оттенки серого, при reduce > 1 — в уменьшенном размере"""
+    return _imread(fname, _GRAY_FLAGS[reduce])
+
+
+def load_color(fname, reduce=1):
+    """Цветное изображение (для превью), при reduce > 1 — в уменьшенном размере"""
+    return _imread(fname, _COLOR_FLAGS[reduce])
+
+
+class FrameStore:
+    """
+    Хранилище декодированных кадров на время сессии.
+    Кадр декодируется один раз и сохраняется в .npy, повторные обращения
+    (в том числе из других процессов пула) открывают его через np.memmap
+    без повторного декодирования JPEG и без копии в памяти процесса.
+    """
+
+    def __init__(self, root=None):
+        self._owned = root is None
+        self.root = root or tempfile.mkdtemp(prefix="frames_")
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, fname, reduce):
+        st = os.stat(fname)
+        key = f"{os.path.abspath(fname)}|{st.st_size}|{st.st_mtime_ns}|{reduce}"
+        return os.path.join(self.root, hashlib.sha1(key.encode()).hexdigest() + ".npy")
+
+    def gray(self, fname, reduce=1):
+        path = self._path(fname, reduce)
+        if os.path.exists(path):
+            return np.load(path, mmap_mode='r')
+        img = load_gray(fname, reduce)
+        # Запись через временный файл: параллельный процесс не увидит недописанный кадр
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, img)
+        os.replace(tmp_path, path)
+        return img
+
+    def close(self):
+        if self._owned:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
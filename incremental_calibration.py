@@ -0,0 +1,170 @@
+# incremental_calibration.py
+# Дообучение калибровки на новых снимках без повторной обработки старых.
+import argparse
+import os
+
+import cv2
+import numpy as np
+
+import cc
+from corner_cache import CornerCache, file_hash
+
+
+def view_key(fname):
+    """
+    Ключ снимка — хэш содержимого, чтобы './4_nov/a.jpg' и '4_nov/a.jpg' (или тот же
+    снимок из другой папки) не считались разными. Если файла уже нет — нормализованный путь.
+    """
+    try:
+        return file_hash(fname)
+    except OSError:
+        return os.path.normcase(os.path.abspath(fname))
+
+
+class IncrementalCalibration:
+    """
+    Накопленные виды (углы доски) и последние параметры камеры.
+    add_images ищет углы только на новых снимках (снимки, отброшенные отбором видов
+    в cc.py --robust/--max-views, новыми не считаются), а refine запускает
+    calibrateCamera с текущими camera_matrix/dist_coeffs как начальным приближением.
+    """
+
+    def __init__(self, chessboard_size=cc.CHESSBOARD_SIZE, square_size=cc.SQUARE_SIZE):
+        self.chessboard_size = chessboard_size
+        self.objp = cc.make_object_points(chessboard_size, square_size)
+        self.img_points = []
+        self.fnames = []
+        self.view_keys = []
+        self.excluded_fnames = set()
+        self.excluded_keys = set()
+        self.image_size = None
+        self.camera_matrix = None
+        self.dist_coeffs = None
+        self.rvecs = None
+        self.tvecs = None
+        self.rms = None
+
+    @classmethod
+    def load(cls, path, chessboard_size=cc.CHESSBOARD_SIZE, square_size=cc.SQUARE_SIZE):
+        """Продолжение калибровки, сохраненной cc.py / save()"""
+        calib = cls(chessboard_size, square_size)
+        with np.load(path) as data:
+            if 'img_points' not in data.files:
+                raise ValueError(f"В {path} нет углов доски — перекалибруйте текущей версией cc.py")
+            calib.img_points = [c.reshape(-1, 1, 2) for c in data['img_points']]
+            calib.fnames = [str(f) for f in data['fnames']]
+            if 'excluded_fnames' in data.files:
+                calib.excluded_fnames = {str(f) for f in data['excluded_fnames']}
+            # Файлы, сохраненные cc.py, ключей не содержат — считаем их по снимкам
+            calib.view_keys = [str(k) for k in data['view_keys']] if 'view_keys' in data.files \
+                else [view_key(f) for f in calib.fnames]
+            calib.excluded_keys = {str(k) for k in data['excluded_keys']} \
+                if 'excluded_keys' in data.files else {view_key(f) for f in calib.excluded_fnames}
+            calib.image_size = (int(data['image_width']), int(data['image_height']))
+            calib.camera_matrix = data['camera_matrix']
+            calib.dist_coeffs = data['dist_coeffs']
+            calib.rvecs = list(data['rvecs'])
+            calib.tvecs = list(data['tvecs'])
+        if len(calib.img_points[0]) != len(calib.objp):
+            raise ValueError(f"Размер доски в {path} не совпадает с {chessboard_size}")
+        return calib
+
+    @property
+    def obj_points(self):
+        return [self.objp] * len(self.img_points)
+
+    def add_views(self, fnames, image_size, img_points, keys=None):
+        """Добавляет уже найденные углы (например, из видео)"""
+        if self.image_size is not None and tuple(image_size) != tuple(self.image_size):
+            raise ValueError(f"Размер кадра {image_size} не совпадает с {self.image_size}")
+        self.image_size = tuple(image_size)
+        self.fnames.extend(fnames)
+        self.view_keys.extend(keys if keys is not None else [view_key(f) for f in fnames])
+        self.img_points.extend(img_points)
+
+    def add_images(self, images, workers=cc.WORKERS, cache=None, scale=cc.DETECT_SCALE):
+        """
+        Ищет углы только на снимках, которых еще нет в калибровке и которые
+        не были из нее исключены. Возвращает количество добавленных видов.
+        """
+        known = set(self.view_keys) | self.excluded_keys
+        new_keys = {}
+        for fname in images:
+            key = view_key(fname)
+            if key not in known:
+                new_keys[fname] = key
+                known.add(key)
+        added_fnames, added_points, image_size = [], [], self.image_size
+        for fname, size, corners in cc.detect_all(list(new_keys), self.chessboard_size, workers,
+                                                  cache, scale):
+            if corners is None:
+                print(f"⚠️ Углы не найдены на {fname}")
+                continue
+            image_size = size
+            added_fnames.append(fname)
+            added_points.append(corners)
+        if added_fnames:
+            self.add_views(added_fnames, image_size, added_points,
+                           [new_keys[f] for f in added_fnames])
+        return len(added_fnames)
+
+    def refine(self):
+        """
+        Калибровка по всем накопленным видам. Если параметры уже известны,
+        они используются как начальное приближение (CALIB_USE_INTRINSIC_GUESS).
+        """
+        if not self.img_points:
+            raise ValueError("Нет ни одного вида с доской — калибровать не по чему")
+        if self.camera_matrix is None:
+            result = cc.calibrate(self.obj_points, self.img_points, self.image_size)
+        else:
+            result = cc.calibrate(self.obj_points, self.img_points, self.image_size,
+                                  self.camera_matrix.copy(), self.dist_coeffs.copy(),
+                                  flags=cv2.CALIB_USE_INTRINSIC_GUESS)
+        self.rms, self.camera_matrix, self.dist_coeffs, self.rvecs, self.tvecs = result
+        return self.rms
+
+    def save(self, path):
+        cc.save_calibration(path, self.camera_matrix, self.dist_coeffs, self.rvecs, self.tvecs,
+                            self.image_size, self.img_points, self.fnames,
+                            sorted(self.excluded_fnames), self.view_keys, sorted(self.excluded_keys))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Добавление новых снимков к существующей калибровке")
+    parser.add_argument("images_dir", help="папка с новыми (и старыми) снимками *.jpg")
+    parser.add_argument("--calibration", default="calibration_data.npz",
+                        help="файл калибровки, который нужно продолжить")
+    parser.add_argument("--workers", type=int, default=cc.WORKERS)
+    parser.add_argument("--scale", type=float, default=cc.DETECT_SCALE)
+    args = parser.parse_args()
+
+    if os.path.exists(args.calibration):
+        calib = IncrementalCalibration.load(args.calibration)
+        print(f"Загружено {len(calib.fnames)} видов из {args.calibration}, "
+              f"исключено отбором: {len(calib.excluded_fnames)}")
+    else:
+        calib = IncrementalCalibration()
+
+    added = calib.add_images(cc.find_images(args.images_dir), args.workers,
+                             CornerCache.for_dataset(args.images_dir), args.scale)
+    print(f"Добавлено видов: {added}")
+    if not calib.img_points:
+        print(f"⚠️ В {args.images_dir} не найдено снимков с доской, калибровка не выполнена")
+        return
+    if not added and calib.camera_matrix is not None:
+        print("Новых снимков нет, калибровка не изменилась")
+        return
+
+    rms = calib.refine()
+    print("\n=== РЕЗУЛЬТАТЫ ===")
+    print("RMS ошибка:", rms)
+    print("Матрица камеры:\n", calib.camera_matrix)
+    print("Коэффициенты дисторсии:\n", calib.dist_coeffs.ravel())
+
+    calib.save(args.calibration)
+    print(f"\n✅ Калибровка обновлена и сохранена в {args.calibration}")
+
+
+if __name__ == "__main__":
+    main()
@@ -53,7 +53,11 @@ class ArucoScannerCameraController {
   // Геттер для ориентации сенсора камеры
   int? get sensorOrientation => _controller?.description.sensorOrientation;
 
-  void setCameraCalibration(CameraCalibration calibration) {
+  /// [undistortMaps] — содержимое assets/undistort_maps.bin (готовые таблицы remap)
+  void setCameraCalibration(
+    CameraCalibration calibration, {
+    Uint8List? undistortMaps,
+  }) {
     _cameraCalibration = calibration;
     _useUndistortion = true;
     print(
@@ -65,6 +69,7 @@ class ArucoScannerCameraController {
       _isolateSendPort!.send({
         'type': 'calibration',
         'calibration': calibration.toJson(),
+        'undistortMaps': undistortMaps,
       });
     }
   }
@@ -308,7 +313,10 @@ class ArucoScannerCameraController {
         if (calibration != null) {
           print('Isolate received camera calibration data');
           final cameraCalibration = CameraCalibration.fromJson(calibration);
-          cvService.setCameraCalibration(cameraCalibration);
+          cvService.setCameraCalibration(
+            cameraCalibration,
+            undistortMaps: message['undistortMaps'] as Uint8List?,
+          );
         } else {
           print('Isolate disabled undistortion');
           cvService.clearCameraCalibration();
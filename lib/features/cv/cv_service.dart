@@ -1,6 +1,7 @@
 import 'dart:async';
 import 'dart:typed_data';
 import 'package:flutter/material.dart';
+import 'package:geodesy/features/cv/undistort_maps_asset.dart';
 import 'package:geodesy/models/aruco_settings.dart';
 import 'package:geodesy/models/camera_calibration.dart';
 import 'package:geodesy/models/marker_detection.dart';
@@ -23,6 +24,8 @@ class CvService {
   cv.Mat? _optimalCameraMatrix;
   cv.Mat? _map1;
   cv.Mat? _map2;
+  CameraCalibration? _calibration;
+  UndistortMapsAsset? _precomputedMaps;
   int _currentWidth = 0;
   int _currentHeight = 0;
 
@@ -60,8 +63,17 @@ class CvService {
     }
   }
 
-  /// Устанавливает параметры калибровки камеры для коррекции дисторсии
-  void setCameraCalibration(CameraCalibration calibration) {
+  /// Устанавливает параметры калибровки камеры для коррекции дисторсии.
+  ///
+  /// [undistortMaps] — содержимое assets/undistort_maps.bin; если таблицы
+  /// построены для этой калибровки, карты не вычисляются на устройстве.
+  void setCameraCalibration(
+    CameraCalibration calibration, {
+    Uint8List? undistortMaps,
+  }) {
+    // Калибровка приходит с каждым кадром — не сбрасываем карты, если она не изменилась
+    if (undistortMaps == null && _isSameCalibration(calibration)) return;
+
     try {
       // Освобождаем старые ресурсы
       _cameraMatrix?.release();
@@ -85,6 +97,21 @@ class CvService {
         cv.MatType.CV_64FC1,
         calibration.distortionCoefficients,
       );
+      _calibration = calibration;
+
+      if (undistortMaps != null) {
+        final asset = UndistortMapsAsset.parse(undistortMaps);
+        if (asset != null && asset.matches(calibration)) {
+          _precomputedMaps = asset;
+          print('Загружены готовые таблицы коррекции дисторсии');
+        } else {
+          _precomputedMaps = null;
+          print('Готовые таблицы не подходят к калибровке, карты будут вычислены');
+        }
+      } else if (_precomputedMaps != null &&
+          !_precomputedMaps!.matches(calibration)) {
+        _precomputedMaps = null;
+      }
 
       print('Параметры калибровки камеры установлены');
       print('Матрица камеры: ${calibration.cameraMatrix}');
@@ -94,6 +121,16 @@ class CvService {
     }
   }
 
+  bool _isSameCalibration(CameraCalibration calibration) {
+    final current = _calibration;
+    if (current == null || _cameraMatrix == null) return false;
+    return listEquals(current.cameraMatrix, calibration.cameraMatrix) &&
+        listEquals(
+          current.distortionCoefficients,
+          calibration.distortionCoefficients,
+        );
+  }
+
   /// Очищает параметры калибровки (отключает коррекцию дисторсии)
   void clearCameraCalibration() {
     _cameraMatrix?.release();
@@ -107,6 +144,8 @@ class CvService {
     _optimalCameraMatrix = null;
     _map1 = null;
     _map2 = null;
+    _calibration = null;
+    _precomputedMaps = null;
 
     print('Коррекция дисторсии отключена');
   }
@@ -120,6 +159,8 @@ class CvService {
       return; // Карты уже вычислены для этого размера
     }
 
+    if (_loadPrecomputedMaps(width, height)) return;
+
     try {
       _map1?.release();
       _map2?.release();
@@ -184,6 +225,37 @@ class CvService {
     }
   }
 
+  /// Берёт карты из assets/undistort_maps.bin, если для размера они есть
+  bool _loadPrecomputedMaps(int width, int height) {
+    final tables = _precomputedMaps?.tablesFor(width, height);
+    if (tables == null) return false;
+
+    try {
+      _map1?.release();
+      _map2?.release();
+
+      final map1 = cv.Mat.zeros(height, width, cv.MatType.CV_16SC2);
+      map1.data.setAll(0, tables.$1);
+      final map2 = cv.Mat.zeros(height, width, cv.MatType.CV_16UC1);
+      map2.data.setAll(0, tables.$2);
+
+      _map1 = map1;
+      _map2 = map2;
+      _currentWidth = width;
+      _currentHeight = height;
+
+      if (showDebug) {
+        print('Готовые карты коррекции дисторсии загружены для $width x $height');
+      }
+      return true;
+    } catch (e) {
+      print('Ошибка при загрузке готовых карт: $e');
+      _map1 = null;
+      _map2 = null;
+      return false;
+    }
+  }
+
   cv.Mat _undistortImage(cv.Mat image, int width, int height) {
     if (_cameraMatrix == null || _distortionCoefficients == null) {
       return image;
@@ -401,6 +473,8 @@ class CvService {
     _optimalCameraMatrix = null;
     _map1 = null;
     _map2 = null;
+    _calibration = null;
+    _precomputedMaps = null;
 
     print('CvService завершён');
   }
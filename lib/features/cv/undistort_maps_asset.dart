@@ -0,0 +1,105 @@
+import 'dart:io' show ZLibCodec;
+import 'dart:typed_data';
+
+import 'package:geodesy/models/camera_calibration.dart';
+
+/// Готовые таблицы remap из assets/undistort_maps.bin.
+///
+/// Файл создаётся convert_calibration.py (формат описан в remap_tables.py):
+/// для каждого разрешения хранятся map1 (CV_16SC2) и map2 (CV_16UC1),
+/// поэтому на устройстве не нужно вызывать initUndistortRectifyMap.
+class UndistortMapsAsset {
+  static const String _magic = 'GRMP';
+  static const int version = 1;
+  static const int _headerSize = 4 + 2 + 2 + 14 * 8;
+  static const int _entrySize = 16;
+
+  final List<double> cameraMatrix;
+  final List<double> distortionCoefficients;
+  final Uint8List _bytes;
+  final Map<(int, int), ({int offset, int size1, int size2})> _entries;
+
+  UndistortMapsAsset._(
+    this._bytes,
+    this.cameraMatrix,
+    this.distortionCoefficients,
+    this._entries,
+  );
+
+  /// Разбирает заголовок файла. Возвращает null, если формат не поддерживается.
+  static UndistortMapsAsset? parse(Uint8List bytes) {
+    if (bytes.length < _headerSize ||
+        String.fromCharCodes(bytes, 0, 4) != _magic) {
+      return null;
+    }
+    final header = ByteData.sublistView(bytes);
+    if (header.getUint16(4, Endian.little) != version) return null;
+    final count = header.getUint16(6, Endian.little);
+
+    final values = List<double>.generate(
+      14,
+      (i) => header.getFloat64(8 + i * 8, Endian.little),
+    );
+
+    final entries = <(int, int), ({int offset, int size1, int size2})>{};
+    var offset = _headerSize + count * _entrySize;
+    for (var i = 0; i < count; i++) {
+      final base = _headerSize + i * _entrySize;
+      final width = header.getUint32(base, Endian.little);
+      final height = header.getUint32(base + 4, Endian.little);
+      final size1 = header.getUint32(base + 8, Endian.little);
+      final size2 = header.getUint32(base + 12, Endian.little);
+      entries[(width, height)] = (offset: offset, size1: size1, size2: size2);
+      offset += size1 + size2;
+    }
+
+    return UndistortMapsAsset._(
+      bytes,
+      values.sublist(0, 9),
+      values.sublist(9),
+      entries,
+    );
+  }
+
+  /// Построены ли таблицы для этой калибровки?
+  bool matches(CameraCalibration calibration, {double tolerance = 1e-9}) {
+    bool same(List<double> a, List<double> b) {
+      if (a.length != b.length) return false;
+      for (var i = 0; i < a.length; i++) {
+        if ((a[i] - b[i]).abs() > tolerance * (1 + a[i].abs())) return false;
+      }
+      return true;
+    }
+
+    return same(cameraMatrix, calibration.cameraMatrix) &&
+        same(distortionCoefficients, calibration.distortionCoefficients);
+  }
+
+  /// Сырые данные map1 (CV_16SC2) и map2 (CV_16UC1) или null,
+  /// если для этого размера таблиц нет.
+  (Uint8List, Uint8List)? tablesFor(int width, int height) {
+    final entry = _entries[(width, height)];
+    if (entry == null) return null;
+    final map1 = _decode(entry.offset, entry.size1, width, height, 2);
+    final map2 = _decode(entry.offset + entry.size1, entry.size2, width, height, 1);
+    return (map1, map2);
+  }
+
+  /// zlib + восстановление значений из разностей соседних элементов строки.
+  /// Значения 16-битные little-endian, как на ARM/x86.
+  Uint8List _decode(int offset, int size, int width, int height, int channels) {
+    final data = Uint8List.fromList(
+      ZLibCodec().decode(Uint8List.sublistView(_bytes, offset, offset + size)),
+    );
+    final values = data.buffer.asUint16List(0, width * height * channels);
+    final rowLength = width * channels;
+    for (var row = 0; row < height; row++) {
+      final start = row * rowLength;
+      for (var i = start + channels; i < start + rowLength; i++) {
+        // Uint16List сохраняет сумму по модулю 2^16, как и при кодировании
+        values[i] = values[i] + values[i - channels];
+      }
+    }
+    return data;
+  }
+}
@@ -1,4 +1,5 @@
 import 'dart:convert';
+import 'dart:typed_data';
 
 import 'package:flutter/material.dart';
 import 'package:camera/camera.dart';
@@ -226,6 +227,17 @@ class _ComboScreenState extends State<ComboScreen> with WidgetsBindingObserver {
     return CameraCalibration.fromJson(jsonData);
   }
 
+  /// Готовые таблицы коррекции дисторсии (создаются convert_calibration.py)
+  Future<Uint8List?> _loadUndistortMaps() async {
+    try {
+      final data = await rootBundle.load('assets/undistort_maps.bin');
+      return data.buffer.asUint8List(data.offsetInBytes, data.lengthInBytes);
+    } catch (e) {
+      print('Готовые таблицы коррекции дисторсии не найдены: $e');
+      return null;
+    }
+  }
+
   /// Инициализирует камеру и начинает распознавание
   Future<void> _initializeCamera() async {
     setState(() {
@@ -269,7 +281,10 @@ class _ComboScreenState extends State<ComboScreen> with WidgetsBindingObserver {
 
       // final calibration = await _loadCalibrationData();
 
-      // _cameraController.setCameraCalibration(calibration);
+      // _cameraController.setCameraCalibration(
+      //   calibration,
+      //   undistortMaps: await _loadUndistortMaps(),
+      // );
 
       // Запустить непрерывное распознавание сразу после инициализации
       _cameraController.startContinuousDetection();
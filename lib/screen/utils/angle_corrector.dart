@@ -0,0 +1,52 @@
+import 'dart:convert';
+
+/// Поправка измеренного расстояния (px) по углу наклона камеры.
+///
+/// Коэффициенты строит angle_corrector.py (AngleCorrector.save): кусочно-кубический
+/// сплайн k(угол), исправленное расстояние = measuredPx * k(angle).
+/// Угол — тот же, что pitch из getCompensatedAngles, в радианах.
+class AngleCorrector {
+  static const int version = 1;
+
+  final List<double> breakpoints;
+  final List<double> coefficients; // по 4 на отрезок: c0..c3
+  final double trueDistance;
+
+  AngleCorrector._(this.breakpoints, this.coefficients, this.trueDistance);
+
+  factory AngleCorrector.fromJson(Map<String, dynamic> json) {
+    if (json['version'] != version) {
+      throw FormatException('Unsupported corrector version: ${json['version']}');
+    }
+    return AngleCorrector._(
+      (json['breakpoints'] as List).cast<num>().map((v) => v.toDouble()).toList(),
+      (json['coefficients'] as List).cast<num>().map((v) => v.toDouble()).toList(),
+      (json['trueDistance'] as num).toDouble(),
+    );
+  }
+
+  factory AngleCorrector.parse(String source) =>
+      AngleCorrector.fromJson(jsonDecode(source) as Map<String, dynamic>);
+
+  /// Поправочный коэффициент; за пределами узлов — крайние отрезки сплайна.
+  double factor(double angle) {
+    final segments = coefficients.length ~/ 4;
+    // Бинарный поиск отрезка: последний узел <= angle
+    var lo = 0;
+    var hi = segments - 1;
+    while (lo < hi) {
+      final mid = (lo + hi + 1) >> 1;
+      if (breakpoints[mid] <= angle) {
+        lo = mid;
+      } else {
+        hi = mid - 1;
+      }
+    }
+    final t = angle - breakpoints[lo];
+    final c = lo * 4;
+    return coefficients[c] +
+        t * (coefficients[c + 1] + t * (coefficients[c + 2] + t * coefficients[c + 3]));
+  }
+
+  double correct(double angle, double measuredPx) => measuredPx * factor(angle);
+}
@@ -0,0 +1,198 @@
+# fv5_cache.py
+# Дисковый кэш HTTP-ответов для t2.py/t3.py/t4.py и fv5_crawler.py.
+# Для каждого URL хранятся тело страницы и заголовки ETag/Last-Modified; повторный запрос
+# отправляется условным (If-None-Match/If-Modified-Since), и при 304 тело берется из кэша.
+# В режиме offline сеть не используется вовсе. При превышении max_bytes удаляются
+# давно не использованные страницы.
+import hashlib
+import json
+import os
+import time
+
+CACHE_DIR = "fv5_cache"
+INDEX_FILENAME = "index.json"
+MAX_BYTES = 256 * 1024 * 1024
+
+
+class CacheMiss(LookupError):
+    """Страницы нет в кэше, а сеть запрещена (offline)"""
+
+
+class CachedResponse:
+    """Минимальная замена requests.Response для скриптов: text и raise_for_status"""
+
+    def __init__(self, url, text, status_code=200, from_cache=False):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.from_cache = from_cache
+
+    def raise_for_status(self):
+        pass
+
+
+class ResponseCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES, offline=False):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._entries = {}
+        self._dirty = False
+        # Счетчики для отчета: сколько байт пришло по сети и сколько ответов 304
+        self.bytes_received = 0
+        self.not_modified = 0
+        self.hits = 0
+        index_path = os.path.join(root, INDEX_FILENAME)
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Индекс кэша {index_path} поврежден и будет пересоздан: {e}")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        return url in self._entries
+
+    def urls(self):
+        return list(self._entries)
+
+    @property
+    def total_bytes(self):
+        return sum(e['size'] for e in self._entries.values())
+
+    def _body_path(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.root, key[:2], key + '.html')
+
+    def get(self, url):
+        """Тело страницы из кэша или None"""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        try:
+            with open(self._body_path(url), encoding='utf-8') as f:
+                text = f.read()
+        except OSError:
+            del self._entries[url]
+            self._dirty = True
+            return None
+        entry['accessed'] = time.time()
+        self._dirty = True
+        return text
+
+    def conditional_headers(self, url):
+        entry = self._entries.get(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, text, etag=None, last_modified=None):
+        path = self._body_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = text.encode('utf-8')
+        # Как и индекс — через временный файл: прерванная запись не оставит обрезанную страницу
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        now = time.time()
+        self._entries[url] = {'etag': etag, 'last_modified': last_modified, 'size': len(data),
+                              'fetched': now, 'accessed': now}
+        self._dirty = True
+
+    def forget(self, url):
+        if self._entries.pop(url, None) is not None:
+            self._dirty = True
+
+    def lookup(self, url):
+        """
+        Что делать перед запросом: (текст, None) — ответить из кэша без сети (offline),
+        (None, заголовки) — выполнить запрос с этими условными заголовками.
+        """
+        if self.offline:
+            text = self.get(url)
+            if text is None:
+                raise CacheMiss(url)
+            self.hits += 1
+            return text, None
+        return None, self.conditional_headers(url)
+
+    def resolve(self, url, status, text, headers, size):
+        """Обрабатывает ответ сервера: 304 — тело из кэша, 200 — сохранить"""
+        self.bytes_received += size
+        if status == 304:
+            cached = self.get(url)
+            if cached is not None:
+                self.not_modified += 1
+                return cached
+            raise CacheMiss(url)
+        self.store(url, text, headers.get('ETag'), headers.get('Last-Modified'))
+        return text
+
+    def fetch(self, url, timeout=None, session=None):
+        """Синхронный запрос через requests с кэшем; ответ с .text как у requests.get"""
+        import requests
+
+        try:
+            text, headers = self.lookup(url)
+        except CacheMiss:
+            raise requests.exceptions.ConnectionError(f"Нет в кэше (offline): {url}")
+        if text is not None:
+            return CachedResponse(url, text, from_cache=True)
+
+        response = (session or requests).get(url, headers=headers, timeout=timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+        try:
+            text = self.resolve(url, response.status_code, response.text, response.headers,
+                                len(response.content))
+        except CacheMiss:
+            # 304 на запись, которой уже нет на диске: повторяем без условий
+            self.forget(url)
+            return self.fetch(url, timeout, session)
+        return CachedResponse(url, text, from_cache=response.status_code == 304)
+
+    def evict(self):
+        """Удаляет давно не использованные страницы, пока размер больше max_bytes"""
+        total = self.total_bytes
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for url, entry in sorted(self._entries.items(), key=lambda item: item[1]['accessed']):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._body_path(url))
+            except OSError:
+                pass
+            total -= entry['size']
+            del self._entries[url]
+            removed += 1
+        self._dirty = True
+        return removed
+
+    def save(self):
+        self.evict()
+        if not self._dirty:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        index_path = os.path.join(self.root, INDEX_FILENAME)
+        # Временный файл и подмена, чтобы прерванный запуск не испортил индекс
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+        self._dirty = False
+
+    def report(self):
+        return (f"кэш: {len(self)} страниц, {self.total_bytes / 1e6:.1f} МБ; по сети получено "
+                f"{self.bytes_received / 1e3:.1f} КБ, ответов 304: {self.not_modified}, "
+                f"из кэша без сети: {self.hits}")
@@ -0,0 +1,84 @@
+# fv5_checkpoint.py
+# Продолжение прерванного обхода по уже записанному JSONL (t4.py, fv5_crawler.py).
+# При запуске файл читается один раз: устройства с деталями считаются готовыми и
+# пропускаются, записи с 'Details': None уходят в очередь повторных попыток.
+# Новые строки дописываются в конец того же файла.
+import json
+import os
+
+# Сколько раз за один запуск повторять страницу, которая вернула None
+RETRIES = 1
+
+
+def record_key(record):
+    """Ключ устройства: URL деталей, а без него — производитель и название"""
+    url = record.get('List URL', 'N/A')
+    if url != 'N/A':
+        return url
+    return f"{record.get('Manufacturer')}/{record.get('Device Name')}"
+
+
+class Checkpoint:
+    def __init__(self, path, resume=True):
+        self.path = path
+        # Ключ -> исходная строка JSONL; порядок — как в файле
+        self.done = {}
+        self.failed = {}
+        self._compact = not resume
+        if resume and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Обрезанная последняя строка после аварийного завершения
+                    self._compact = True
+                    continue
+                key = record_key(record)
+                if key in self.done or key in self.failed:
+                    # Повтор записи: действует последняя
+                    self.done.pop(key, None)
+                    self.failed.pop(key, None)
+                    self._compact = True
+                # Без URL повторять нечего — такая запись тоже готова
+                if record.get('Details') is None and record.get('List URL', 'N/A') != 'N/A':
+                    self.failed[key] = line
+                    self._compact = True
+                else:
+                    self.done[key] = line if line.endswith('\n') else line + '\n'
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def pending(self, devices):
+        """
+        Устройства для обхода: сначала новые, затем очередь повторов
+        (записанные ранее с 'Details': None). Готовые пропускаются.
+        """
+        new, retry = [], []
+        for device in devices:
+            key = record_key(device)
+            if key in self.done:
+                continue
+            (retry if key in self.failed else new).append(device)
+        return new + retry
+
+    def open(self):
+        """
+        Файл для дописывания. Если в нем есть неудачные, повторные или обрезанные
+        строки, он сначала переписывается с одними готовыми записями
+        (временный файл и подмена).
+        """
+        if self._compact:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(self.done.values())
+            os.replace(tmp_path, self.path)
+            self._compact = False
+        return open(self.path, 'a', encoding='utf-8')
+
+    def report(self):
+        return f"готово: {len(self.done)}, на повтор: {len(self.failed)}"
@@ -0,0 +1,258 @@
+# fv5_crawler.py
+# Асинхронный обход страниц деталей camerafv5.com вместо последовательного t4.py:
+# один пул соединений aiohttp, ограниченное число одновременных запросов и
+# token bucket, который держит ту же среднюю частоту запросов, что паузы 5–15 с в t4.py,
+# но не заставляет запросы ждать ответа друг друга. Ответы кэшируются (fv5_cache.py).
+import argparse
+import asyncio
+import json
+import time
+
+import aiohttp
+
+from fv5_cache import CACHE_DIR, CacheMiss, ResponseCache
+from fv5_checkpoint import RETRIES, Checkpoint
+from fv5_parse import parse_camera_details, parse_device_list
+
+LIST_URL = 'https://www.camerafv5.com/devices/manufacturers/xiaomi/'
+OUTPUT_FILENAME = 'xiaomi_devices_detailed.jsonl'
+
+# Средняя пауза в t4.py — 10 с, то есть 0.1 запроса в секунду
+RATE = 0.1
+# Сколько запросов можно сделать подряд после простоя
+BURST = 3
+# Одновременных запросов (и соединений в пуле)
+CONCURRENCY = 4
+TIMEOUT = 10
+LIST_TIMEOUT = 15
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты: rate токенов в секунду, не больше capacity в запасе.
+    Каждый запрос забирает токен; ждущие получают токены по очереди.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class CrawlStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.pages = 0
+        self.errors = 0
+        # Устройства: поставлено в очередь и записано (по всем производителям)
+        self.devices_total = 0
+        self.devices_done = 0
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def pages_per_second(self):
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    def progress(self):
+        return (f"{self.devices_done}/{self.devices_total}, {self.pages_per_second:.2f} стр/с, "
+                f"ошибок: {self.errors}")
+
+
+class Crawler:
+    """
+    Загрузка страниц через общую сессию с ограничением частоты.
+    С cache запросы условные, а в режиме offline страницы берутся только из кэша.
+    """
+
+    def __init__(self, session, limiter, stats=None, cache=None):
+        self.session = session
+        self.limiter = limiter
+        self.stats = stats or CrawlStats()
+        self.cache = cache
+
+    async def fetch(self, url, timeout=TIMEOUT):
+        headers = {}
+        if self.cache is not None:
+            text, headers = self.cache.lookup(url)
+            if text is not None:
+                self.stats.pages += 1
+                return text
+
+        await self.limiter.acquire()
+        async with self.session.get(url, headers=headers,
+                                    timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status != 304:
+                response.raise_for_status()
+            body = await response.read()
+            text = body.decode(response.get_encoding()) if response.status != 304 else ''
+            status, response_headers = response.status, response.headers
+        self.stats.pages += 1
+
+        if self.cache is None:
+            return text
+        try:
+            return self.cache.resolve(url, status, text, response_headers, len(body))
+        except CacheMiss:
+            # 304 на запись, которой уже нет на диске: повторяем без условий
+            self.cache.forget(url)
+            return await self.fetch(url, timeout)
+
+    async def extract_camera_details(self, detail_url):
+        """Асинхронный аналог extract_camera_details из t4.py: словарь с деталями или None"""
+        print(f"Обработка URL: {detail_url}")
+        try:
+            html = await self.fetch(detail_url)
+        except CacheMiss:
+            print(f"  Ошибка: {detail_url} нет в кэше (offline)")
+        except asyncio.TimeoutError:
+            print(f"  Ошибка: Таймаут при запросе к {detail_url}")
+        except aiohttp.ClientError as e:
+            print(f"  Ошибка при запросе к {detail_url}: {e}")
+        except Exception as e:
+            # Ошибка декодирования ответа, записи в кэш и т.п. — как в t4.py, одна страница
+            # не должна останавливать весь обход; страница уйдет в очередь повторов
+            print(f"  Произошла ошибка при загрузке {detail_url}: {type(e).__name__}: {e}")
+        else:
+            try:
+                return parse_camera_details(html, detail_url)
+            except Exception as e:
+                print(f"  Произошла ошибка при парсинге {detail_url}: {e}")
+        self.stats.errors += 1
+        return None
+
+
+async def fetch_device_list(crawler, manufacturer, list_url):
+    """Устройства производителя или None, если список не загрузился"""
+    try:
+        devices = parse_device_list(await crawler.fetch(list_url, LIST_TIMEOUT), list_url)
+    except CacheMiss:
+        print(f"Ошибка: список {manufacturer} нет в кэше (offline)")
+        return None
+    except asyncio.TimeoutError:
+        print(f"Ошибка: Таймаут при запросе к списку {manufacturer} {list_url}")
+        return None
+    except aiohttp.ClientError as e:
+        print(f"Ошибка при запросе к списку {manufacturer} {list_url}: {e}")
+        return None
+    except Exception as e:
+        print(f"Ошибка при загрузке списка {manufacturer} {list_url}: {type(e).__name__}: {e}")
+        return None
+    if devices is None:
+        print(f"Ошибка: Не удалось найти div с id='device-list' на странице {list_url}")
+    return devices
+
+
+async def crawl_tasks(crawler, tasks, concurrency=CONCURRENCY, retries=RETRIES):
+    """
+    Обходит страницы деталей и пишет по строке JSON на устройство (в порядке завершения).
+    tasks — пары (устройство, файл): у нескольких производителей общая очередь и
+    общие concurrency задач в работе. Неудачные страницы возвращаются в конец
+    очереди не больше retries раз.
+    """
+    queue = asyncio.Queue()
+    for device, outfile in tasks:
+        queue.put_nowait((device, outfile, 0))
+    crawler.stats.devices_total += queue.qsize()
+
+    async def worker():
+        while True:
+            try:
+                device, outfile, attempt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            url = device['List URL']
+            details = await crawler.extract_camera_details(url) if url != 'N/A' else None
+            if details is None and url != 'N/A' and attempt < retries:
+                queue.put_nowait((device, outfile, attempt + 1))
+                continue
+            outfile.write(json.dumps({**device, 'Details': details}, ensure_ascii=False) + '\n')
+            outfile.flush()
+            crawler.stats.devices_done += 1
+            print(f"  Записаны данные для {device['Manufacturer']} {device['Device Name']} "
+                  f"[{crawler.stats.progress()}]")
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def crawl_devices(crawler, devices, outfile, concurrency=CONCURRENCY, retries=RETRIES):
+    """Устройства одного производителя в один файл (см. crawl_tasks)"""
+    await crawl_tasks(crawler, [(device, outfile) for device in devices], concurrency, retries)
+
+
+async def crawl(list_url=LIST_URL, output_filename=OUTPUT_FILENAME, rate=RATE, burst=BURST,
+                concurrency=CONCURRENCY, limit=None, cache=None, resume=True):
+    """
+    Список устройств производителя и все страницы деталей; возвращает CrawlStats.
+    С resume устройства, уже записанные в output_filename, пропускаются (fv5_checkpoint.py).
+    """
+    checkpoint = Checkpoint(output_filename, resume=resume)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        crawler = Crawler(session, TokenBucket(rate, burst), cache=cache)
+
+        print(f"Загрузка списка устройств с {list_url}...")
+        try:
+            devices = await fetch_device_list(crawler, 'устройств', list_url)
+            if devices is None:
+                print("Критическая ошибка: список устройств не получен")
+                return crawler.stats
+            if limit:
+                devices = devices[:limit]
+            print(f"Найдено устройств: {len(devices)} ({checkpoint.report()})")
+            devices = checkpoint.pending(devices)
+            print(f"Осталось обработать: {len(devices)}")
+
+            with checkpoint.open() as outfile:
+                await crawl_devices(crawler, devices, outfile, concurrency)
+        finally:
+            if cache is not None:
+                cache.save()
+
+    stats = crawler.stats
+    print(f"\nОбработка {len(devices)} устройств завершена: {stats.pages} страниц за "
+          f"{stats.elapsed:.1f} с ({stats.pages_per_second:.2f} стр/с), ошибок: {stats.errors}")
+    if cache is not None:
+        print(cache.report())
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Асинхронный сбор характеристик камер с camerafv5.com")
+    parser.add_argument("list_url", nargs="?", default=LIST_URL)
+    parser.add_argument("--output", default=OUTPUT_FILENAME)
+    parser.add_argument("--rate", type=float, default=RATE, help="запросов в секунду в среднем")
+    parser.add_argument("--burst", type=int, default=BURST)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--limit", type=int, default=None, help="обработать только первые N устройств")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false")
+    parser.add_argument("--offline", action="store_true", help="только из кэша, без сети")
+    parser.add_argument("--restart", dest="resume", action="store_false",
+                        help="начать заново, не продолжая записанный --output")
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.cache_dir, offline=args.offline) if args.use_cache else None
+    asyncio.run(crawl(args.list_url, args.output, args.rate, args.burst, args.concurrency,
+                      args.limit, cache, args.resume))
+
+
+if __name__ == "__main__":
+    main()
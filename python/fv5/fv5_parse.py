@@ -0,0 +1,257 @@
+# fv5_parse.py
+# Разбор страниц camerafv5.com: список устройств производителя и страница деталей камеры.
+# Логика та же, что в extract_camera_details из t4.py, но без сети — HTML передается готовым,
+# поэтому ее используют и t4.py, и асинхронный fv5_crawler.py.
+#
+# Движки разбора (ENGINE):
+#   'lxml' — дерево строит lxml (C), обход без BeautifulSoup; самый быстрый, нужен lxml;
+#   'soup' — BeautifulSoup + html.parser, но строятся только нужные поддеревья (SoupStrainer);
+#   'full' — исходный вариант: вся страница через html.parser (эталон для fv5_parse_bench.py).
+import re
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+CARD_CLASS = 'card card-icon-3 card-body justify-content-between'
+TARGET_SECTIONS = ["Lens", "Sensor", "Image", "Focusing", "Exposure and ISO"]
+ROW_CLASS = re.compile(r'col-\d+|col-\w+-\d+')
+# Страница производителя: /devices/manufacturers/<производитель>/
+MANUFACTURER_URL = re.compile(r'/devices/manufacturers/([^/?#]+)/?$')
+
+ENGINES = ('lxml', 'soup', 'full')
+ENGINE = 'lxml' if lxml is not None else 'soup'
+
+
+def _is_card_class(value):
+    # SoupStrainer получает class строкой как в разметке, find_all — списком классов
+    if not value:
+        return False
+    return ' '.join(value.split() if isinstance(value, str) else value) == CARD_CLASS
+
+
+DEVICE_LIST_STRAINER = SoupStrainer('div', id='device-list')
+CARD_STRAINER = SoupStrainer('div', class_=_is_card_class)
+
+
+def absolute_url(href, base_url):
+    if href.startswith('//'):
+        return 'https:' + href
+    return urljoin(base_url, href)
+
+
+# --- BeautifulSoup ('soup', 'full') ---
+
+def _soup(html, engine, strainer):
+    return BeautifulSoup(html, 'html.parser', parse_only=strainer if engine == 'soup' else None)
+
+
+def _soup_device_links(html, engine):
+    """(производитель, название, href) для ссылок из div#device-list или None"""
+    device_list_div = _soup(html, engine, DEVICE_LIST_STRAINER).find('div', id='device-list')
+    if not device_list_div:
+        return None
+    links = []
+    for device_link in device_list_div.find_all('a', class_='list-group-item'):
+        manufacturer_span = device_link.find('span', class_='device-manufacturer')
+        name_span = device_link.find('span', class_='device-name')
+        links.append((manufacturer_span.text if manufacturer_span else None,
+                      name_span.text if name_span else None,
+                      device_link.get('href')))
+    return links
+
+
+def _soup_sections(html, engine):
+    """(заголовок, [(ключ, значение), ...]) для каждой карточки до последнего нужного блока"""
+    # Находим все карточки с данными
+    for card in _soup(html, engine, CARD_STRAINER).find_all('div', class_=CARD_CLASS):
+        # Ищем заголовок секции (может быть h2 или span)
+        title_tag = card.find(['h2', 'span'], class_='h2')
+        if not title_tag:
+            title_tag = card.find('span', class_='h2')  # Специально для "Lens"
+        title = title_tag.text.strip() if title_tag else None
+        if title not in TARGET_SECTIONS:
+            yield title, None
+            continue
+
+        # Находим все колонки с данными внутри карточки
+        rows = []
+        for row in card.find_all('div', class_=ROW_CLASS):
+            value_tag = row.find('span', class_='display-4')
+            key_tag = row.find('span', class_='h6')
+            if value_tag and key_tag:
+                # Ключ — текст до возможного help-icon
+                rows.append((key_tag.contents[0].strip(), value_tag.text))
+        yield title, rows
+
+
+# --- lxml ---
+
+def _lxml_root(html):
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # Строка с XML-объявлением кодировки: lxml принимает ее только как байты
+        return lxml.html.document_fromstring(html.encode('utf-8'))
+    except lxml.etree.ParserError:
+        # Пустая страница: html.parser дает пустое дерево, а не исключение
+        return lxml.html.Element('html')
+
+
+def _classes(element):
+    return (element.get('class') or '').split()
+
+
+def _has_class(element, name):
+    return name in _classes(element)
+
+
+def _find(element, tags, class_name):
+    """Первый потомок с одним из тегов и классом — как find(tags, class_=...) в bs4"""
+    for child in element.iterdescendants(*tags):
+        if _has_class(child, class_name):
+            return child
+    return None
+
+
+def _lxml_device_links(html):
+    matches = _lxml_root(html).xpath('//div[@id="device-list"]')
+    if not matches:
+        return None
+    links = []
+    for device_link in matches[0].iterdescendants('a'):
+        if not _has_class(device_link, 'list-group-item'):
+            continue
+        manufacturer_span = _find(device_link, ('span',), 'device-manufacturer')
+        name_span = _find(device_link, ('span',), 'device-name')
+        links.append((manufacturer_span.text_content() if manufacturer_span is not None else None,
+                      name_span.text_content() if name_span is not None else None,
+                      device_link.get('href')))
+    return links
+
+
+def _is_row(element):
+    classes = _classes(element)
+    # bs4 сравнивает регулярное выражение с каждым классом и со всей строкой class
+    return any(ROW_CLASS.search(c) for c in classes) or \
+        (len(classes) > 1 and ROW_CLASS.search(' '.join(classes)))
+
+
+def _lxml_sections(html):
+    root = _lxml_root(html)
+    for card in root.iter('div'):
+        if ' '.join(_classes(card)) != CARD_CLASS:
+            continue
+        title_tag = _find(card, ('h2', 'span'), 'h2')
+        title = title_tag.text_content().strip() if title_tag is not None else None
+        if title not in TARGET_SECTIONS:
+            yield title, None
+            continue
+
+        rows = []
+        for row in card.iterdescendants('div'):
+            if not _is_row(row):
+                continue
+            value_tag = _find(row, ('span',), 'display-4')
+            key_tag = _find(row, ('span',), 'h6')
+            if value_tag is not None and key_tag is not None:
+                # contents[0] в bs4: текст до первого вложенного тега
+                if key_tag.text is None:
+                    raise ValueError(f"нет текста ключа в {lxml.html.tostring(key_tag)[:80]!r}")
+                rows.append((key_tag.text.strip(), value_tag.text_content()))
+        yield title, rows
+
+
+# --- Общий интерфейс ---
+
+def parse_device_list(html, list_url, engine=None):
+    """
+    Устройства со страницы производителя: список словарей
+    {'Manufacturer', 'Device Name', 'List URL'}; None, если на странице нет div#device-list.
+    URL равен 'N/A', если у ссылки нет href.
+    """
+    engine = engine or ENGINE
+    links = _lxml_device_links(html) if engine == 'lxml' else _soup_device_links(html, engine)
+    if links is None:
+        return None
+
+    devices = []
+    for manufacturer, name, href in links:
+        devices.append({
+            'Manufacturer': manufacturer.strip() if manufacturer is not None else 'N/A',
+            'Device Name': name.strip() if name is not None else 'N/A',
+            'List URL': absolute_url(href, list_url) if href else 'N/A',
+        })
+    return devices
+
+
+def parse_manufacturers(html, base_url):
+    """
+    Производители со страницы-указателя: список пар (slug, URL списка устройств)
+    в порядке появления на странице, без повторов.
+    """
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('a', href=True))
+    manufacturers = {}
+    for link in soup.find_all('a', href=True):
+        url = absolute_url(link['href'], base_url)
+        match = MANUFACTURER_URL.search(url)
+        if match and match.group(1) not in manufacturers:
+            manufacturers[match.group(1)] = url if url.endswith('/') else url + '/'
+    return list(manufacturers.items())
+
+
+def parse_camera_details(html, detail_url=None, engine=None):
+    """
+    Данные из блоков 'Lens', 'Sensor', 'Image', 'Focusing', 'Exposure and ISO'.
+    Возвращает словарь с деталями или None, если ни одного блока нет.
+    """
+    engine = engine or ENGINE
+    sections = _lxml_sections(html) if engine == 'lxml' else _soup_sections(html, engine)
+    details = {}
+    found_sections_count = 0
+
+    for title, rows in sections:
+        if rows is not None:
+            details[title] = {}
+            found_sections_count += 1
+            for key, value in rows:
+                # Значение без лишних пробелов/переносов
+                details[title][key] = ' '.join(value.split())
+
+        # Если нашли последнюю нужную секцию, дальше страницу не разбираем
+        if title == TARGET_SECTIONS[-1]:
+            break
+
+    # Предупреждение, если не все секции найдены
+    if found_sections_count < len(TARGET_SECTIONS):
+        print(f"  Предупреждение: Не все целевые разделы найдены на {detail_url}. "
+              f"Найдены: {list(details.keys())}")
+
+    return details if details else None
+
+
+def _parse_page(page):
+    html, detail_url, engine = page
+    try:
+        return parse_camera_details(html, detail_url, engine)
+    except Exception as e:
+        print(f"  Произошла ошибка при парсинге {detail_url}: {e}")
+        return None
+
+
+def parse_pages(pages, workers=None, engine=None, chunksize=16):
+    """
+    Разбор множества сохраненных страниц деталей: pages — пары (html, url).
+    Возвращает детали в том же порядке (None при ошибке). При workers > 1
+    страницы разбираются в пуле процессов.
+    """
+    items = [(html, url, engine or ENGINE) for html, url in pages]
+    if not workers or workers <= 1:
+        return [_parse_page(item) for item in items]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(_parse_page, items, chunksize=chunksize))
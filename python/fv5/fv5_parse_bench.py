@@ -0,0 +1,92 @@
+# fv5_parse_bench.py
+# Замер скорости разбора страниц деталей на сохраненном корпусе — страницах из кэша
+# ответов (fv5_cache.py), а если он пуст, на страницах заглушки (fv5_stub_server.py).
+# Сравниваются движки fv5_parse.py (результат каждого сверяется с эталоном 'full')
+# и разбор в пуле процессов.
+#
+#   python fv5_parse_bench.py                       # корпус из fv5_cache/
+#   python fv5_parse_bench.py --stub 500 --workers 8
+import argparse
+import contextlib
+import io
+import os
+import re
+import time
+
+from fv5_cache import CACHE_DIR, ResponseCache
+from fv5_parse import ENGINE, ENGINES, lxml, parse_camera_details, parse_pages
+
+# URL страницы деталей: /devices/manufacturers/<производитель>/<устройство>/
+DETAIL_URL = re.compile(r'/devices/manufacturers/[^/]+/[^/]+/?$')
+REPEATS = 3
+
+
+def load_corpus(cache_dir=CACHE_DIR, limit=None):
+    """Пары (html, url) страниц деталей из кэша ответов"""
+    cache = ResponseCache(cache_dir)
+    urls = sorted(url for url in cache.urls() if DETAIL_URL.search(url))[:limit]
+    pages = []
+    for url in urls:
+        html = cache.get(url)
+        if html is not None:
+            pages.append((html, url))
+    return pages
+
+
+def stub_corpus(count):
+    from fv5_stub_server import detail_page
+    return [(detail_page(i), f"stub/device{i}") for i in range(count)]
+
+
+def time_engine(pages, engine, repeats=REPEATS):
+    """Лучшее время разбора корпуса из repeats проходов и результаты"""
+    best = float('inf')
+    for _ in range(repeats):
+        # Предупреждения о неполных страницах не печатаем и не замеряем
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            results = [parse_camera_details(html, url, engine) for html, url in pages]
+            best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер скорости разбора страниц camerafv5.com")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--stub", type=int, default=200,
+                        help="страниц заглушки, если в кэше нет страниц деталей")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE, help="движок для разбора в пуле")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.cache_dir, args.limit)
+    source = args.cache_dir
+    if not pages:
+        pages = stub_corpus(args.stub)
+        source = "заглушка"
+    size = sum(len(html) for html, _ in pages)
+    print(f"Корпус: {len(pages)} страниц, {size / 1e6:.1f} МБ ({source})")
+
+    engines = [e for e in ENGINES if e != 'lxml' or lxml is not None]
+    reference = None
+    timings = {}
+    for engine in reversed(engines):
+        elapsed, results = time_engine(pages, engine)
+        if reference is None:
+            reference = results
+        mismatches = sum(a != b for a, b in zip(results, reference))
+        timings[engine] = elapsed
+        print(f"{engine:<6}{elapsed / len(pages) * 1e3:>8.2f} мс/стр{len(pages) / elapsed:>9.0f} стр/с"
+              f"{timings['full'] / elapsed:>7.1f}x   расхождений с 'full': {mismatches}")
+
+    for workers in sorted({1, args.workers}):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            parse_pages(pages, workers, args.engine)
+            elapsed = time.perf_counter() - start
+        print(f"пул, {args.engine}, процессов {workers}: {elapsed:.2f} с ({len(pages) / elapsed:.0f} стр/с)")
+
+
+if __name__ == "__main__":
+    main()
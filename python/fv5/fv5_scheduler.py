@@ -0,0 +1,126 @@
+# fv5_scheduler.py
+# Обход нескольких производителей camerafv5.com за один запуск вместо правки URL
+# в t4.py/fv5_crawler.py для каждого. У всех производителей общие сессия (пул соединений),
+# token bucket, кэш ответов и очередь задач, поэтому средняя частота запросов к сайту
+# та же, что у одного fv5_crawler.py. Каждый производитель пишется в свой JSONL
+# и продолжается с места остановки (fv5_checkpoint.py).
+#
+#   python fv5_scheduler.py xiaomi samsung google   # заданные производители
+#   python fv5_scheduler.py                         # все со страницы-указателя
+import argparse
+import asyncio
+import os
+from contextlib import ExitStack
+from itertools import chain, zip_longest
+from urllib.parse import urljoin
+
+import aiohttp
+
+from fv5_cache import CACHE_DIR, CacheMiss, ResponseCache
+from fv5_checkpoint import Checkpoint
+from fv5_crawler import (BURST, CONCURRENCY, LIST_TIMEOUT, RATE, Crawler, TokenBucket, crawl_tasks,
+                         fetch_device_list)
+from fv5_parse import parse_manufacturers
+
+MANUFACTURERS_URL = 'https://www.camerafv5.com/devices/manufacturers/'
+# Имя файла как у t4.py: xiaomi_devices_detailed.jsonl
+OUTPUT_PATTERN = '{manufacturer}_devices_detailed.jsonl'
+OUTPUT_DIR = '.'
+
+
+def output_path(output_dir, manufacturer):
+    return os.path.join(output_dir, OUTPUT_PATTERN.format(manufacturer=manufacturer))
+
+
+def interleave(groups):
+    """Задачи по очереди от каждого производителя, чтобы все продвигались одновременно"""
+    return [task for task in chain.from_iterable(zip_longest(*groups)) if task is not None]
+
+
+async def schedule(manufacturers=None, index_url=MANUFACTURERS_URL, output_dir=OUTPUT_DIR,
+                   rate=RATE, burst=BURST, concurrency=CONCURRENCY, limit=None, cache=None,
+                   resume=True):
+    """
+    Обходит производителей manufacturers (slug, как в URL), а без них — всех со страницы
+    index_url. limit ограничивает число устройств у каждого. Возвращает общий CrawlStats.
+    """
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        crawler = Crawler(session, TokenBucket(rate, burst), cache=cache)
+        targets, lists = [], []
+        try:
+            if manufacturers:
+                targets = [(m, urljoin(index_url, m + '/')) for m in manufacturers]
+            else:
+                print(f"Загрузка списка производителей с {index_url}...")
+                try:
+                    targets = parse_manufacturers(await crawler.fetch(index_url, LIST_TIMEOUT),
+                                                  index_url)
+                except CacheMiss:
+                    print(f"Критическая ошибка: страницы производителей {index_url} нет в кэше (offline)")
+                    return crawler.stats
+                except asyncio.TimeoutError:
+                    print(f"Критическая ошибка: Таймаут при запросе к {index_url}")
+                    return crawler.stats
+                except aiohttp.ClientError as e:
+                    print(f"Критическая ошибка при запросе к {index_url}: {e}")
+                    return crawler.stats
+            print(f"Производителей: {len(targets)}")
+
+            # Списки устройств загружаются параллельно через тот же ограничитель
+            lists = await asyncio.gather(*(fetch_device_list(crawler, m, url) for m, url in targets))
+
+            with ExitStack() as stack:
+                groups = []
+                for (manufacturer, _), devices in zip(targets, lists):
+                    if devices is None:
+                        continue
+                    checkpoint = Checkpoint(output_path(output_dir, manufacturer), resume=resume)
+                    pending = checkpoint.pending(devices[:limit] if limit else devices)
+                    print(f"  {manufacturer}: устройств {len(devices)}, осталось {len(pending)} "
+                          f"({checkpoint.report()})")
+                    outfile = stack.enter_context(checkpoint.open())
+                    groups.append([(device, outfile) for device in pending])
+                await crawl_tasks(crawler, interleave(groups), concurrency)
+        finally:
+            if cache is not None:
+                cache.save()
+
+    stats = crawler.stats
+    print(f"\nОбработано {stats.devices_done} устройств у {len(targets)} производителей: "
+          f"{stats.pages} страниц за {stats.elapsed:.1f} с ({stats.pages_per_second:.2f} стр/с), "
+          f"ошибок: {stats.errors}")
+    for (manufacturer, _), devices in zip(targets, lists):
+        path = output_path(output_dir, manufacturer)
+        if devices is not None and os.path.exists(path):
+            print(f"  {manufacturer}: {Checkpoint(path).report()} -> {path}")
+    if cache is not None:
+        print(cache.report())
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сбор характеристик камер нескольких производителей")
+    parser.add_argument("manufacturers", nargs="*",
+                        help="производители как в URL (xiaomi, samsung); без них — все со страницы-указателя")
+    parser.add_argument("--index-url", default=MANUFACTURERS_URL)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--rate", type=float, default=RATE, help="запросов в секунду в среднем, на всех")
+    parser.add_argument("--burst", type=int, default=BURST)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--limit", type=int, default=None, help="первые N устройств каждого производителя")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false")
+    parser.add_argument("--offline", action="store_true", help="только из кэша, без сети")
+    parser.add_argument("--restart", dest="resume", action="store_false",
+                        help="начать заново, не продолжая записанные файлы")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    cache = ResponseCache(args.cache_dir, offline=args.offline) if args.use_cache else None
+    asyncio.run(schedule(args.manufacturers, args.index_url, args.output_dir, args.rate, args.burst,
+                         args.concurrency, args.limit, cache, args.resume))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# fv5_stub_server.py
+# Локальная заглушка camerafv5.com для проверки и замеров краулера без обращения к сайту:
+# страница списка устройств и страницы деталей в той же разметке, с искусственной задержкой.
+#
+#   python fv5_stub_server.py --devices 200 --latency 0.2          # только сервер
+#   python fv5_stub_server.py --devices 200 --latency 0.2 --bench  # сервер + fv5_crawler
+#   python fv5_stub_server.py --manufacturers xiaomi samsung google --bench  # + fv5_scheduler
+import argparse
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEVICES = 50
+LATENCY = 0.2
+PORT = 8765
+MANUFACTURER = "xiaomi"
+# Страницы заглушки не меняются — одна дата изменения для всех
+LAST_MODIFIED = "Mon, 03 Nov 2025 12:00:00 GMT"
+
+_DETAIL_ROW = ('<div class="col-6"><span class="display-4">{value}</span>'
+               '<span class="h6">{key}<i class="help-icon"></i></span></div>')
+
+
+def device_slug(index):
+    return f"device{index}_stub_0"
+
+
+def index_page(manufacturers):
+    links = "".join(f'<li><a href="/devices/manufacturers/{m}/">{m.capitalize()}</a></li>'
+                    for m in manufacturers)
+    return f'<html><body><nav><a href="/">Home</a></nav><ul>{links}</ul></body></html>'
+
+
+def list_page(manufacturer, count):
+    links = "".join(
+        f'<a class="list-group-item" href="/devices/manufacturers/{manufacturer}/{device_slug(i)}/">'
+        f'<span class="device-manufacturer">{manufacturer.capitalize()}</span>'
+        f'<span class="device-name">Device {i}</span></a>'
+        for i in range(count))
+    return f'<html><body><div id="device-list">{links}</div></body></html>'
+
+
+def detail_page(index):
+    sections = {
+        "Lens": {"Focal length (35mm)": f"{24 + index % 10}.0 mm", "Focal length": "4.3 mm",
+                 "Horizontal field of view": "70.0º"},
+        "Sensor": {"Sensor size": "1/2.0\"", "Pixel size": "0.8 µm"},
+        "Image": {"Resolution": "48 MP"},
+        "Focusing": {"Autofocus": "Yes"},
+        "Exposure and ISO": {"ISO range": "100 - 6400"},
+    }
+    cards = "".join(
+        f'<div class="card card-icon-3 card-body justify-content-between">'
+        f'<h2 class="h2">{title}</h2>'
+        + "".join(_DETAIL_ROW.format(key=k, value=v) for k, v in rows.items())
+        + '</div>'
+        for title, rows in sections.items())
+    # Лишняя разметка, как на настоящей странице (меню, подвал)
+    filler = '<nav>' + '<a href="#">link</a>' * 200 + '</nav>'
+    return f'<html><head><title>Device {index}</title></head><body>{filler}{cards}{filler}</body></html>'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    devices = DEVICES
+    latency = LATENCY
+    manufacturers = (MANUFACTURER,)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        parts = [p for p in self.path.split('/') if p]
+        body = None
+        if parts == ['devices', 'manufacturers']:
+            body = index_page(self.manufacturers)
+        elif parts[:2] == ['devices', 'manufacturers'] and len(parts) > 2 and \
+                parts[2] in self.manufacturers:
+            if len(parts) == 3:
+                body = list_page(parts[2], self.devices)
+            elif len(parts) == 4 and parts[3].startswith('device'):
+                index = int(parts[3][len('device'):].split('_')[0])
+                if index < self.devices:
+                    body = detail_page(index)
+        if body is None:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag or \
+                self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=PORT, devices=DEVICES, latency=LATENCY, manufacturers=(MANUFACTURER,)):
+    """
+    Запускает заглушку в фоновом потоке; возвращает (server, URL списка первого
+    производителя). Указатель производителей — на уровень выше.
+    """
+    handler = type('Handler', (StubHandler,), {
+        'devices': devices, 'latency': latency, 'manufacturers': tuple(manufacturers)})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/devices/manufacturers/{manufacturers[0]}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заглушка camerafv5.com")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--devices", type=int, default=DEVICES, help="устройств у каждого производителя")
+    parser.add_argument("--manufacturers", nargs="+", default=[MANUFACTURER])
+    parser.add_argument("--latency", type=float, default=LATENCY, help="задержка ответа, с")
+    parser.add_argument("--bench", action="store_true", help="прогнать fv5_crawler и выйти")
+    parser.add_argument("--rate", type=float, default=20.0, help="частота запросов краулера в --bench")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cache", action="store_true",
+                        help="в --bench: два прохода с кэшем ответов, затем offline")
+    args = parser.parse_args()
+
+    server, list_url = start_server(args.port, args.devices, args.latency, args.manufacturers)
+    print(f"Заглушка: {list_url}")
+    if not args.bench:
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if len(args.manufacturers) > 1:
+        # Несколько производителей: планировщик сам находит их на странице-указателе
+        from fv5_scheduler import schedule
+        index_url = list_url.rsplit('/', 2)[0] + '/'
+        stats = asyncio.run(schedule(index_url=index_url, output_dir=tempfile.mkdtemp(),
+                                     rate=args.rate, burst=args.concurrency,
+                                     concurrency=args.concurrency, resume=False))
+        print(f"Записано {stats.devices_done} из {args.devices * len(args.manufacturers)} устройств")
+        server.shutdown()
+        return
+
+    from fv5_crawler import crawl
+    from fv5_cache import ResponseCache
+    workdir = tempfile.mkdtemp()
+    output = os.path.join(workdir, "stub_devices.jsonl")
+    cache_dir = os.path.join(workdir, "cache")
+    # Кэш открывается заново перед каждым проходом — как при повторном запуске скрипта
+    runs = [None] if not args.cache else [
+        lambda: ResponseCache(cache_dir), lambda: ResponseCache(cache_dir),
+        lambda: ResponseCache(cache_dir, offline=True)]
+    for make_cache in runs:
+        cache = make_cache() if make_cache else None
+        stats = asyncio.run(crawl(list_url, output, rate=args.rate, burst=args.concurrency,
+                                 concurrency=args.concurrency, cache=cache, resume=False))
+        with open(output, encoding='utf-8') as f:
+            lines = f.readlines()
+        print(f"Записано {len(lines)} из {args.devices} устройств, ошибок: {stats.errors}")
+    print(f"Последовательно (как t4.py без пауз) ожидалось бы ~{1 / args.latency:.1f} стр/с")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,12 @@ from bs4 import BeautifulSoup
 import pandas as pd
 import re # Импортируем модуль для регулярных выражений
 
+from fv5_cache import ResponseCache
+
+# Кэш ответов: повторный запуск отправляет условные запросы.
+# offline=True — только из кэша, без сети
+http_cache = ResponseCache(offline=False)
+
 # --- Функция для извлечения деталей камеры с отдельной страницы ---
 def extract_camera_details(detail_url):
     """
@@ -12,7 +18,7 @@ def extract_camera_details(detail_url):
     details = {}
     print(f"Обработка URL: {detail_url}") # Добавим логгирование
     try:
-        response = requests.get(detail_url)
+        response = http_cache.fetch(detail_url)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
 
@@ -76,7 +82,7 @@ all_device_data = []
 
 try:
     # Отправляем GET-запрос к странице списка
-    list_response = requests.get(list_url)
+    list_response = http_cache.fetch(list_url)
     list_response.raise_for_status()
 
     # Парсим список
@@ -137,6 +143,9 @@ except requests.exceptions.RequestException as e:
     print(f"Ошибка при запросе к {list_url}: {e}")
 except Exception as e:
     print(f"Произошла ошибка при парсинге списка: {e}")
+finally:
+    # Сохраняем индекс кэша, даже если обход прерван
+    http_cache.save()
 
 # --- Вывод или сохранение результатов ---
 if all_device_data:
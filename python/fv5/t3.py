@@ -5,6 +5,12 @@ import re
 import time  # Импортируем модуль time
 import random # Импортируем модуль random
 
+from fv5_cache import ResponseCache
+
+# Кэш ответов: повторный запуск отправляет условные запросы.
+# offline=True — только из кэша, без сети
+http_cache = ResponseCache(offline=False)
+
 # --- Функция для извлечения деталей камеры с отдельной страницы ---
 def extract_camera_details(detail_url):
     """
@@ -14,7 +20,7 @@ def extract_camera_details(detail_url):
     details = {}
     print(f"Обработка URL: {detail_url}")
     try:
-        response = requests.get(detail_url)
+        response = http_cache.fetch(detail_url)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
 
@@ -69,7 +75,7 @@ list_url = 'https://www.camerafv5.com/devices/manufacturers/xiaomi/'
 all_device_data = []
 
 try:
-    list_response = requests.get(list_url)
+    list_response = http_cache.fetch(list_url)
     list_response.raise_for_status()
     list_soup = BeautifulSoup(list_response.text, 'html.parser')
     device_list_div = list_soup.find('div', id='device-list')
@@ -135,6 +141,9 @@ except requests.exceptions.RequestException as e:
     print(f"Ошибка при запросе к {list_url}: {e}")
 except Exception as e:
     print(f"Произошла ошибка при парсинге списка: {e}")
+finally:
+    # Сохраняем индекс кэша, даже если обход прерван
+    http_cache.save()
 
 # --- Вывод или сохранение результатов ---
 if all_device_data:
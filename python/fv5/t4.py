@@ -1,11 +1,17 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import re
 import time
 import random
 import json
-from urllib.parse import urljoin # Импортируем urljoin для удобства
+from collections import deque
+
+from fv5_cache import ResponseCache
+from fv5_checkpoint import RETRIES, Checkpoint
+from fv5_parse import parse_camera_details, parse_device_list
+
+# Кэш ответов: повторный запуск отправляет условные запросы.
+# offline=True — только из кэша, без сети
+http_cache = ResponseCache(offline=False)
 
 # --- Функция для извлечения деталей камеры с отдельной страницы ---
 def extract_camera_details(detail_url):
@@ -14,55 +20,13 @@ def extract_camera_details(detail_url):
     из блоков 'Lens', 'Sensor', 'Image', 'Focusing', 'Exposure and ISO'.
     Возвращает словарь с деталями или None при ошибке.
     """
-    details = {}
     print(f"Обработка URL: {detail_url}")
     try:
         # Устанавливаем таймаут для запроса (например, 10 секунд)
-        response = requests.get(detail_url, timeout=10)
+        response = http_cache.fetch(detail_url, timeout=10)
         response.raise_for_status() # Проверяем HTTP ошибки (4xx, 5xx)
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Находим все карточки с данными
-        cards = soup.find_all('div', class_='card card-icon-3 card-body justify-content-between')
-        target_sections = ["Lens", "Sensor", "Image", "Focusing", "Exposure and ISO"]
-        found_sections_count = 0
-        current_section_title = None
-
-        for card in cards:
-            # Ищем заголовок секции (может быть h2 или span)
-            title_tag = card.find(['h2', 'span'], class_='h2')
-            if not title_tag:
-                 title_tag = card.find('span', class_='h2') # Специально для "Lens"
-
-            if title_tag and title_tag.text.strip() in target_sections:
-                current_section_title = title_tag.text.strip()
-                details[current_section_title] = {}
-                found_sections_count += 1
-                # print(f"  Найден раздел: {current_section_title}") # Для отладки
-
-                # Находим все колонки с данными внутри карточки
-                data_rows = card.find_all('div', class_=re.compile(r'col-\d+|col-\w+-\d+'))
-
-                for row in data_rows:
-                     value_tag = row.find('span', class_='display-4')
-                     key_tag = row.find('span', class_='h6')
-
-                     if value_tag and key_tag:
-                         # Получаем ключ (текст до возможного help-icon)
-                         key = key_tag.contents[0].strip()
-                         # Получаем значение, очищаем от лишних пробелов/переносов
-                         value = ' '.join(value_tag.text.split())
-                         # Добавляем пару ключ-значение в словарь секции
-                         details[current_section_title][key] = value
-                         # print(f"    {key}: {value}") # Для отладки
-
-            # Если нашли последнюю нужную секцию, выходим из цикла по карточкам
-            if current_section_title == target_sections[-1]:
-                 break
-
-        # Предупреждение, если не все секции найдены
-        if found_sections_count < len(target_sections):
-             print(f"  Предупреждение: Не все целевые разделы найдены на {detail_url}. Найдены: {list(details.keys())}")
+        # Разбор страницы — общий с асинхронным fv5_crawler.py
+        details = parse_camera_details(response.text, detail_url)
 
     # Обработка сетевых ошибок
     except requests.exceptions.Timeout:
@@ -76,80 +40,81 @@ def extract_camera_details(detail_url):
         print(f"  Произошла ошибка при парсинге {detail_url}: {e}")
         return None
 
-    # Возвращаем словарь с деталями, или None если он пуст
-    return details if details else None
+    # Словарь с деталями, или None если он пуст
+    return details
 
 # --- Основная часть скрипта (парсинг списка и запись в файл) ---
 
 list_url = 'https://www.camerafv5.com/devices/manufacturers/xiaomi/'
 output_filename = 'xiaomi_devices_detailed.jsonl' # Имя файла для сохранения
 
+# Продолжить с места остановки: готовые устройства из файла пропускаются,
+# записи без деталей запрашиваются повторно. False — начать заново
+resume = True
+checkpoint = Checkpoint(output_filename, resume=resume)
+
 # Используем 'try...except' для перехвата критических ошибок (файл, сеть)
 try:
-    # Открываем файл для записи ПЕРЕД циклом в режиме 'w' (перезапись)
-    with open(output_filename, 'w', encoding='utf-8') as outfile:
-        print(f"Данные будут записываться в файл: {output_filename}")
+    # Файл открывается на дописывание; уже записанные устройства сохраняются
+    with checkpoint.open() as outfile:
+        print(f"Данные будут записываться в файл: {output_filename} ({checkpoint.report()})")
 
         # 1. Получаем HTML страницы со списком устройств
         print(f"Загрузка списка устройств с {list_url}...")
-        list_response = requests.get(list_url, timeout=15) # Таймаут для списка
+        list_response = http_cache.fetch(list_url, timeout=15) # Таймаут для списка
         list_response.raise_for_status()
         print("Список загружен.")
 
         # 2. Парсим список устройств
-        list_soup = BeautifulSoup(list_response.text, 'html.parser')
-        device_list_div = list_soup.find('div', id='device-list')
+        devices = parse_device_list(list_response.text, list_url)
 
-        if not device_list_div:
+        if devices is None:
             print(f"Критическая ошибка: Не удалось найти div с id='device-list' на странице {list_url}")
             # Выход, если не нашли основной контейнер
         else:
-            devices = device_list_div.find_all('a', class_='list-group-item')
-            total_devices = len(devices)
-            print(f"Найдено устройств для обработки: {total_devices}")
+            print(f"Найдено устройств: {len(devices)}")
+            # Сначала новые устройства, в конце — очередь повторов
+            queue = deque(checkpoint.pending(devices))
+            total_devices = len(queue)
+            print(f"Осталось обработать: {total_devices}")
 
             # --- Ограничение для теста (опционально) ---
-            # devices = devices[:5]
-            # total_devices = len(devices)
+            # queue = deque(list(queue)[:5])
+            # total_devices = len(queue)
             # print(f"Ограничение: обрабатываем {total_devices} устройств")
             # --- Конец ограничения ---
 
-            # 3. Итерация по списку устройств
-            for index, device_link in enumerate(devices):
-                # Извлекаем базовую информацию из списка
-                manufacturer_span = device_link.find('span', class_='device-manufacturer')
-                name_span = device_link.find('span', class_='device-name')
-                detail_page_url_relative = device_link.get('href')
-
-                manufacturer = manufacturer_span.text.strip() if manufacturer_span else 'N/A'
-                name = name_span.text.strip() if name_span else 'N/A'
-                full_detail_url = 'N/A'
+            # 3. Обход очереди устройств
+            attempts = {}
+            index = 0
+            while queue:
+                device = queue.popleft()
+                manufacturer = device['Manufacturer']
+                name = device['Device Name']
+                full_detail_url = device['List URL']
                 camera_details = None
 
-                # 4. Получение URL деталей и извлечение данных
-                if detail_page_url_relative:
-                    # Формируем абсолютный URL
-                    if detail_page_url_relative.startswith('//'):
-                        full_detail_url = 'https:' + detail_page_url_relative
-                    else:
-                        full_detail_url = urljoin(list_url, detail_page_url_relative) # Используем urljoin
-
-                    # --- Случайная пауза перед запросом ---
-                    sleep_duration = random.uniform(5, 15)
-                    print(f"\n--- Пауза перед {manufacturer} {name} ({index + 1}/{total_devices}) на {sleep_duration:.2f} сек ---")
-                    time.sleep(sleep_duration)
+                # 4. Извлечение данных со страницы деталей
+                if full_detail_url != 'N/A':
+                    # --- Случайная пауза между запросами (первый запрос — сразу) ---
+                    if index:
+                        sleep_duration = random.uniform(5, 15)
+                        print(f"\n--- Пауза перед {manufacturer} {name} ({index + 1}/{total_devices}) на {sleep_duration:.2f} сек ---")
+                        time.sleep(sleep_duration)
                     # --- Конец паузы ---
 
                     # Вызываем функцию для получения деталей
                     camera_details = extract_camera_details(full_detail_url)
-
+                    index += 1
+
+                    # Неудача — в конец очереди, пока не исчерпаны попытки
+                    attempts[full_detail_url] = attempts.get(full_detail_url, 0) + 1
+                    if camera_details is None and attempts[full_detail_url] <= RETRIES:
+                        print(f"  Повтор {manufacturer} {name} — в конце очереди")
+                        queue.append(device)
+                        continue
                 else:
-                    print(f"Предупреждение: Не найден URL для {manufacturer} {name} ({index + 1}/{total_devices})")
-                    # --- Пауза (даже если URL не найден) ---
-                    sleep_duration = random.uniform(5, 15)
-                    print(f"\n--- Пауза (URL не найден) на {sleep_duration:.2f} сек ---")
-                    time.sleep(sleep_duration)
-                    # --- Конец паузы ---
+                    print(f"Предупреждение: Не найден URL для {manufacturer} {name}")
 
                 # 5. Формирование записи для файла
                 device_info = {
@@ -179,6 +144,9 @@ except IOError as e:
     print(f"Критическая ошибка при работе с файлом {output_filename}: {e}")
 except Exception as e:
     print(f"Произошла непредвиденная ошибка во время выполнения: {e}")
+finally:
+    # Сохраняем индекс кэша, даже если обход прерван
+    http_cache.save()
 
 
 # --- Загрузка и проверка данных из файла (опционально, после завершения скрипта) ---
@@ -0,0 +1,84 @@
+# test_fv5_cache.py
+# Кэш ответов (fv5_cache.py) вместе с fv5_crawler.py на локальной заглушке:
+# условные запросы с ответом 304 и повтор обхода без сети.
+#
+#   python -m pytest -q python/fv5
+import asyncio
+import json
+import os
+
+import aiohttp
+import pytest
+
+from fv5_cache import CacheMiss, ResponseCache
+from fv5_crawler import Crawler, TokenBucket, crawl
+from fv5_stub_server import start_server
+
+DEVICES = 4
+
+
+@pytest.fixture(scope="module")
+def stub():
+    server, list_url = start_server(port=0, devices=DEVICES, latency=0)
+    yield list_url
+    server.shutdown()
+    server.server_close()
+
+
+def read_details(path):
+    with open(path, encoding='utf-8') as f:
+        return {r['List URL']: r['Details'] for r in map(json.loads, f)}
+
+
+def run_crawl(list_url, output, cache):
+    return asyncio.run(crawl(list_url, str(output), rate=100, burst=DEVICES, concurrency=2,
+                             cache=cache, resume=False))
+
+
+def test_revalidation_returns_cached_body(stub, tmp_path):
+    cache_dir = tmp_path / "cache"
+    first = ResponseCache(str(cache_dir))
+    run_crawl(stub, tmp_path / "first.jsonl", first)
+    assert first.not_modified == 0
+    # Список и страницы деталей
+    assert len(first) == DEVICES + 1
+
+    # Новый запуск: все запросы условные, сервер отвечает 304, тела берутся из кэша
+    second = ResponseCache(str(cache_dir))
+    stats = run_crawl(stub, tmp_path / "second.jsonl", second)
+    assert stats.errors == 0
+    assert second.not_modified == DEVICES + 1
+    assert second.bytes_received == 0
+    assert read_details(tmp_path / "second.jsonl") == read_details(tmp_path / "first.jsonl")
+
+
+def test_offline_replay(stub, tmp_path):
+    cache_dir = tmp_path / "cache"
+    run_crawl(stub, tmp_path / "online.jsonl", ResponseCache(str(cache_dir)))
+
+    offline = ResponseCache(str(cache_dir), offline=True)
+    stats = run_crawl(stub, tmp_path / "offline.jsonl", offline)
+    assert stats.errors == 0
+    assert offline.hits == DEVICES + 1
+    assert offline.bytes_received == 0
+    assert read_details(tmp_path / "offline.jsonl") == read_details(tmp_path / "online.jsonl")
+
+    async def fetch_unknown():
+        async with aiohttp.ClientSession() as session:
+            await Crawler(session, TokenBucket(100), cache=offline).fetch(stub + 'unknown/')
+
+    with pytest.raises(CacheMiss):
+        asyncio.run(fetch_unknown())
+
+
+def test_store_leaves_no_temporary_files(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.store('https://example.com/a/', 'первая версия', etag='"1"')
+    cache.store('https://example.com/a/', 'вторая версия', etag='"2"')
+    cache.save()
+
+    names = [name for _, _, files in os.walk(tmp_path) for name in files]
+    assert not [name for name in names if name.endswith('.tmp')]
+    reopened = ResponseCache(str(tmp_path))
+    assert reopened.get('https://example.com/a/') == 'вторая версия'
+    assert reopened.conditional_headers('https://example.com/a/') == {'If-None-Match': '"2"'}
@@ -0,0 +1,107 @@
+# test_fv5_crawler.py
+# Проверка fv5_crawler.py на локальной заглушке (fv5_stub_server.py), без обращения к сайту.
+#
+#   python -m pytest -q python/fv5
+import asyncio
+import json
+import time
+
+import aiohttp
+import pytest
+
+from fv5_checkpoint import RETRIES
+from fv5_crawler import Crawler, TokenBucket, crawl, crawl_devices
+from fv5_parse import parse_camera_details
+from fv5_stub_server import detail_page, start_server
+
+DEVICES = 6
+
+
+@pytest.fixture(scope="module")
+def stub():
+    server, list_url = start_server(port=0, devices=DEVICES, latency=0)
+    yield list_url
+    server.shutdown()
+    server.server_close()
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_crawl_matches_parse_camera_details(stub, tmp_path):
+    output = tmp_path / "devices.jsonl"
+    stats = asyncio.run(crawl(stub, str(output), rate=100, burst=DEVICES, concurrency=3,
+                              resume=False))
+
+    records = read_jsonl(output)
+    assert stats.errors == 0
+    assert stats.devices_done == DEVICES
+    assert len(records) == DEVICES
+    # Порядок строк — порядок завершения, сверяем по URL
+    for record in records:
+        index = int(record['List URL'].rstrip('/').rsplit('/', 1)[1][len('device'):].split('_')[0])
+        assert record['Device Name'] == f"Device {index}"
+        assert record['Details'] == parse_camera_details(detail_page(index))
+
+
+def test_token_bucket_keeps_rate():
+    rate, count = 40.0, 21
+
+    async def run():
+        bucket = TokenBucket(rate, capacity=1)
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(count)))
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    # Первый токен в запасе, остальные приходят по одному раз в 1/rate с
+    expected = (count - 1) / rate
+    assert expected * 0.95 <= elapsed < expected + 0.25
+
+
+def test_token_bucket_burst():
+    async def run():
+        bucket = TokenBucket(1.0, capacity=5)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # Запас capacity расходуется без ожидания
+    assert asyncio.run(run()) < 0.1
+
+
+def test_failed_page_retried_then_written_as_null(stub, tmp_path):
+    # device99 заглушка не знает и отвечает 404
+    devices = [
+        {'Manufacturer': 'Xiaomi', 'Device Name': 'Device 0', 'List URL': stub + 'device0_stub_0/'},
+        {'Manufacturer': 'Xiaomi', 'Device Name': 'Missing', 'List URL': stub + 'device99_stub_0/'},
+    ]
+    attempts = {}
+
+    async def run(outfile):
+        async with aiohttp.ClientSession() as session:
+            crawler = Crawler(session, TokenBucket(100, 10))
+            extract = crawler.extract_camera_details
+
+            async def counting_extract(url):
+                attempts[url] = attempts.get(url, 0) + 1
+                return await extract(url)
+
+            crawler.extract_camera_details = counting_extract
+            await crawl_devices(crawler, devices, outfile, concurrency=2)
+            return crawler.stats
+
+    output = tmp_path / "devices.jsonl"
+    with open(output, 'w', encoding='utf-8') as outfile:
+        stats = asyncio.run(run(outfile))
+
+    assert attempts[devices[0]['List URL']] == 1
+    assert attempts[devices[1]['List URL']] == RETRIES + 1
+    assert stats.errors == RETRIES + 1
+    records = {r['Device Name']: r for r in read_jsonl(output)}
+    assert len(records) == 2
+    assert records['Device 0']['Details'] == parse_camera_details(detail_page(0))
+    assert records['Missing']['Details'] is None
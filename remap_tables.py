@@ -0,0 +1,88 @@
+# remap_tables.py
+# Готовые таблицы remap (CV_16SC2 + таблица интерполяции CV_16UC1) для приложения.
+#
+# Формат файла (little-endian), версия 1:
+#   char[4]    "GRMP"
+#   uint16     версия
+#   uint16     количество таблиц N
+#   float64[9] матрица камеры, по строкам
+#   float64[5] коэффициенты дисторсии k1, k2, p1, p2, k3
+#   N раз:     uint32 ширина, uint32 высота, uint32 размер map1, uint32 размер map2
+#   далее для каждой таблицы подряд: map1, затем map2
+#
+# map1 (int16, ширина*высота*2) и map2 (uint16, ширина*высота) хранятся как разности
+# соседних значений в строке (по модулю 2^16), сжатые zlib. Карты гладкие, поэтому
+# разности почти постоянны и сжимаются в десятки раз. Новая матрица камеры —
+# getOptimalNewCameraMatrix с alpha=1, как в CvService._computeUndistortMaps.
+import struct
+import zlib
+
+import cv2
+import numpy as np
+
+MAGIC = b"GRMP"
+VERSION = 1
+ALPHA = 1.0
+
+_HEADER = struct.Struct("<4sHH9d5d")
+_ENTRY = struct.Struct("<IIII")
+
+
+def build_remap(K, D, size, alpha=ALPHA):
+    """Таблицы (map1 CV_16SC2, map2 CV_16UC1) для размера кадра size = (ширина, высота)"""
+    new_K, _ = cv2.getOptimalNewCameraMatrix(K, D, size, alpha, size)
+    return cv2.initUndistortRectifyMap(K, D, None, new_K, size, cv2.CV_16SC2)
+
+
+def _encode(table):
+    """Разности по строке (для каждого канала отдельно) + zlib"""
+    rows = table.view(np.uint16).reshape(table.shape[0], -1)
+    channels = 1 if table.ndim == 2 else table.shape[2]
+    delta = rows.copy()
+    delta[:, channels:] -= rows[:, :-channels]
+    return zlib.compress(delta.astype('<u2').tobytes(), 9)
+
+
+def _decode(data, height, width, channels, dtype):
+    delta = np.frombuffer(zlib.decompress(data), dtype='<u2').reshape(height, width, channels)
+    table = np.cumsum(delta, axis=1, dtype=np.uint16).view(dtype)
+    return table if channels > 1 else table[:, :, 0]
+
+
+def write_remap_asset(path, K, D, sizes, alpha=ALPHA):
+    """Сохраняет таблицы для всех размеров sizes в один бинарный файл"""
+    K = np.asarray(K, dtype=np.float64).reshape(3, 3)
+    D = np.ravel(np.asarray(D, dtype=np.float64))[:5]
+    entries, payload = [], []
+    for width, height in sizes:
+        map1, map2 = build_remap(K, D, (width, height), alpha)
+        m1, m2 = _encode(map1), _encode(map2)
+        entries.append(_ENTRY.pack(width, height, len(m1), len(m2)))
+        payload += [m1, m2]
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(sizes), *K.ravel(), *D))
+        f.write(b"".join(entries))
+        f.write(b"".join(payload))
+
+
+def read_remap_asset(path):
+    """Возвращает (K, D, {(ширина, высота): (map1, map2)})"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, count, *values = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: неизвестный формат таблиц remap ({magic!r}, версия {version})")
+    K = np.array(values[:9]).reshape(3, 3)
+    D = np.array(values[9:])
+
+    offset = _HEADER.size + count * _ENTRY.size
+    tables = {}
+    for i in range(count):
+        width, height, size1, size2 = _ENTRY.unpack_from(data, _HEADER.size + i * _ENTRY.size)
+        map1 = _decode(data[offset:offset + size1], height, width, 2, np.int16)
+        offset += size1
+        map2 = _decode(data[offset:offset + size2], height, width, 1, np.uint16)
+        offset += size2
+        tables[(width, height)] = (map1, map2)
+    return K, D, tables
@@ -0,0 +1,173 @@
+# video_source.py
+# Калибровка по видео с доской: ленивое чтение кадров, отсев размытых и повторяющихся кадров
+# дешевыми метриками до дорогого поиска углов.
+import argparse
+import os
+from collections import deque
+
+import cv2
+import numpy as np
+
+import cc
+from view_selection import excluded_fnames, robust_calibrate, save_report
+
+# Брать каждый N-й кадр (остальные пропускаются через grab() без retrieve и конвертации)
+FRAME_STEP = 5
+# Порог резкости: дисперсия лапласиана на уменьшенном кадре
+MIN_SHARPNESS = 50.0
+# Порог отличия от последнего принятого кадра: средняя абсолютная разница миниатюр (0..255)
+MIN_DIFFERENCE = 6.0
+THUMB_SIZE = (64, 36)
+# Размер уменьшенной копии для оценки резкости (по длинной стороне)
+SHARPNESS_SIZE = 640
+# Сколько кадров одновременно ждут поиска углов в пуле — ограничивает память
+MAX_PENDING = 8
+
+
+def iter_frames(path, step=FRAME_STEP):
+    """Лениво отдает (номер, кадр в оттенках серого) для каждого step-го кадра"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Не удалось открыть видео {path}")
+    index = 0
+    try:
+        while True:
+            if index % step:
+                # grab() без retrieve: кадр не копируется и не конвертируется в BGR
+                if not cap.grab():
+                    break
+            else:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                yield index, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            index += 1
+    finally:
+        cap.release()
+
+
+def sharpness(gray):
+    """Дисперсия лапласиана на уменьшенной копии — чем меньше, тем сильнее размытие"""
+    scale = SHARPNESS_SIZE / max(gray.shape)
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return cv2.Laplacian(gray, cv2.CV_32F).var()
+
+
+def thumbnail(gray):
+    return cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+class FrameFilter:
+    """Отсев размытых кадров и почти повторов последнего принятого кадра"""
+
+    def __init__(self, min_sharpness=MIN_SHARPNESS, min_difference=MIN_DIFFERENCE):
+        self.min_sharpness = min_sharpness
+        self.min_difference = min_difference
+        self._last_thumb = None
+        self.rejected_blur = 0
+        self.rejected_duplicate = 0
+
+    def accept(self, gray):
+        thumb = thumbnail(gray)
+        if self._last_thumb is not None and \
+                np.mean(np.abs(thumb - self._last_thumb)) < self.min_difference:
+            self.rejected_duplicate += 1
+            return False
+        if sharpness(gray) < self.min_sharpness:
+            self.rejected_blur += 1
+            return False
+        self._last_thumb = thumb
+        return True
+
+
+def _detect_frame(index, gray, chessboard_size, scale):
+    return index, gray.shape[::-1], cc.find_corners(gray, chessboard_size, scale)
+
+
+def detect_video(path, step=FRAME_STEP, chessboard_size=cc.CHESSBOARD_SIZE, scale=cc.DETECT_SCALE,
+                 frame_filter=None, pool=None, max_pending=MAX_PENDING):
+    """
+    Ищет доску на отобранных кадрах видео. Одновременно в памяти не больше
+    max_pending кадров; от найденных видов хранятся только углы.
+    Возвращает список (имя вида, image_size, corners) в порядке кадров.
+    """
+    frame_filter = frame_filter or FrameFilter()
+    views = []
+    pending = deque()
+
+    def collect(future):
+        index, size, corners = future.result()
+        if corners is not None:
+            views.append((f"{path}#{index}", size, corners))
+
+    candidates = 0
+    for index, gray in iter_frames(path, step):
+        if not frame_filter.accept(gray):
+            continue
+        candidates += 1
+        if pool is None:
+            index, size, corners = _detect_frame(index, gray, chessboard_size, scale)
+            if corners is not None:
+                views.append((f"{path}#{index}", size, corners))
+            continue
+        if len(pending) >= max_pending:
+            collect(pending.popleft())
+        pending.append(pool.submit(_detect_frame, index, gray, chessboard_size, scale))
+    while pending:
+        collect(pending.popleft())
+
+    print(f"Кадров-кандидатов: {candidates}, размытых: {frame_filter.rejected_blur}, "
+          f"повторов: {frame_filter.rejected_duplicate}, доска найдена: {len(views)}")
+    return views
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Калибровка камеры по видео с шахматной доской")
+    parser.add_argument("video")
+    parser.add_argument("--step", type=int, default=FRAME_STEP, help="брать каждый N-й кадр")
+    parser.add_argument("--min-sharpness", type=float, default=MIN_SHARPNESS)
+    parser.add_argument("--min-difference", type=float, default=MIN_DIFFERENCE)
+    parser.add_argument("--scale", type=float, default=cc.DETECT_SCALE)
+    parser.add_argument("--workers", type=int, default=cc.WORKERS)
+    parser.add_argument("--max-views", type=int, default=40,
+                        help="сколько разнообразных видов использовать для калибровки")
+    parser.add_argument("--output", default=None,
+                        help="файл калибровки; по умолчанию <имя видео>_calibration.npz рядом с видео, "
+                             "чтобы не затереть calibration_data.npz от cc.py")
+    parser.add_argument("--report", default=None,
+                        help="JSON с ошибками по видам; по умолчанию <имя видео>_report.json")
+    args = parser.parse_args()
+    stem = os.path.splitext(args.video)[0]
+    output = args.output or f"{stem}_calibration.npz"
+    report_path = args.report or f"{stem}_report.json"
+
+    frame_filter = FrameFilter(args.min_sharpness, args.min_difference)
+    with cc.make_pool(args.workers) as pool:
+        views = detect_video(args.video, args.step, scale=args.scale,
+                             frame_filter=frame_filter, pool=pool)
+    if len(views) < 3:
+        print("⚠️ Слишком мало видов с доской для калибровки")
+        return
+
+    fnames = [v[0] for v in views]
+    img_points = [v[2] for v in views]
+    image_size = views[0][1]
+    rms, K, D, rvecs, tvecs, report = robust_calibrate(cc.make_object_points(), img_points,
+                                                       image_size, fnames, args.max_views)
+    selected = set(report['selected'])
+    cc.save_calibration(output, K, D, rvecs, tvecs, image_size,
+                        [c for c, f in zip(img_points, fnames) if f in selected], report['selected'],
+                        excluded_fnames(report))
+    save_report(report_path, report)
+
+    print("\n=== РЕЗУЛЬТАТЫ ===")
+    print("RMS ошибка:", rms)
+    print("Матрица камеры:\n", K)
+    print("Коэффициенты дисторсии:\n", D.ravel())
+    print(f"\n✅ Калибровка по {len(selected)} видам сохранена в {output}")
+    print(f"Ошибки по видам сохранены в {report_path}")
+
+
+if __name__ == "__main__":
+    main()
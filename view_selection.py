@@ -0,0 +1,141 @@
+# view_selection.py
+# Ошибка репроекции по видам, отбраковка выбросов и выбор компактного набора снимков.
+import json
+
+import cv2
+import numpy as np
+
+import cc
+
+# Вид считается выбросом, если его ошибка больше медианы на OUTLIER_K робастных сигм (MAD)
+OUTLIER_K = 3.0
+# Нижняя граница порога, px — чтобы не выбрасывать виды при очень малом разбросе ошибок
+MIN_THRESHOLD = 0.5
+MAX_ITERATIONS = 3
+
+
+def per_view_errors(obj_points, img_points, rvecs, tvecs, camera_matrix, dist_coeffs):
+    """RMS ошибки репроекции (px) для каждого вида по rvecs/tvecs калибровки"""
+    errors = np.empty(len(img_points))
+    for i, (objp, corners, rvec, tvec) in enumerate(zip(obj_points, img_points, rvecs, tvecs)):
+        projected, _ = cv2.projectPoints(objp, rvec, tvec, camera_matrix, dist_coeffs)
+        diff = projected.reshape(-1, 2) - np.reshape(corners, (-1, 2))
+        errors[i] = np.sqrt(np.mean(np.sum(diff ** 2, axis=1)))
+    return errors
+
+
+def outlier_mask(errors, k=OUTLIER_K, min_threshold=MIN_THRESHOLD):
+    """Маска выбросов: ошибка > медиана + k * 1.4826 * MAD"""
+    median = np.median(errors)
+    mad = 1.4826 * np.median(np.abs(errors - median))
+    threshold = max(median + k * mad, min_threshold)
+    return errors > threshold, threshold
+
+
+def view_features(img_points, rvecs, image_size):
+    """
+    Признаки вида для оценки разнообразия: положение и размер доски в кадре
+    и ее ориентация относительно камеры.
+    """
+    w, h = image_size
+    diag = np.hypot(w, h)
+    features = []
+    for corners, rvec in zip(img_points, rvecs):
+        pts = np.reshape(corners, (-1, 2))
+        cx, cy = pts.mean(axis=0)
+        size = np.sqrt(cv2.contourArea(cv2.convexHull(pts.astype(np.float32)))) / diag
+        features.append([cx / w, cy / h, size, *np.ravel(rvec)])
+    return np.array(features)
+
+
+def select_spread(features, max_views, first=0):
+    """
+    Жадный выбор max_views наиболее удаленных друг от друга видов
+    (farthest point sampling), начиная с вида first.
+    """
+    n = len(features)
+    if n <= max_views:
+        return list(range(n))
+    scaled = (features - features.mean(axis=0)) / (features.std(axis=0) + 1e-9)
+    selected = [first]
+    dist = np.linalg.norm(scaled - scaled[first], axis=1)
+    while len(selected) < max_views:
+        nxt = int(np.argmax(dist))
+        selected.append(nxt)
+        dist = np.minimum(dist, np.linalg.norm(scaled - scaled[nxt], axis=1))
+    return sorted(selected)
+
+
+def robust_calibrate(objp, img_points, image_size, fnames, max_views=None,
+                     k=OUTLIER_K, max_iterations=MAX_ITERATIONS):
+    """
+    Калибровка с отбраковкой выбросов и (при max_views) выбором подмножества видов.
+    Возвращает (rms, camera_matrix, dist_coeffs, rvecs, tvecs, report), где rvecs/tvecs
+    относятся к report['selected'], а report — словарь для сохранения в JSON.
+
+    Выбросы только отбрасываются целиком: cv2.calibrateCamera не принимает веса видов,
+    поэтому понижать вес сомнительных видов здесь нельзя.
+    report['rejection_threshold_px'] — порог последнего раунда, в котором виды были
+    отброшены (None, если не отброшено ни одного), а report['final_error_px'] —
+    разброс ошибок видов итоговой калибровки.
+    """
+    active = list(range(len(img_points)))
+    rejected = []
+    rejection_threshold = None
+
+    def calibrate_active():
+        pts = [img_points[i] for i in active]
+        rms, K, D, rvecs, tvecs = cc.calibrate([objp] * len(pts), pts, image_size)
+        errors = per_view_errors([objp] * len(pts), pts, rvecs, tvecs, K, D)
+        return rms, K, D, rvecs, tvecs, errors
+
+    rms, K, D, rvecs, tvecs, errors = calibrate_active()
+    all_errors = dict(zip(active, errors))
+    for _ in range(max_iterations):
+        mask, threshold = outlier_mask(errors, k)
+        # Оставляем хотя бы 3 вида, иначе калибровка неустойчива
+        if not mask.any() or len(active) - mask.sum() < 3:
+            break
+        rejection_threshold = threshold
+        rejected.extend(i for i, bad in zip(active, mask) if bad)
+        active = [i for i, bad in zip(active, mask) if not bad]
+        rms, K, D, rvecs, tvecs, errors = calibrate_active()
+
+    if max_views and len(active) > max_views:
+        # rvecs соответствуют текущему active после последней калибровки
+        features = view_features([img_points[i] for i in active], rvecs, image_size)
+        best = int(np.argmin(errors))
+        active = [active[j] for j in select_spread(features, max_views, best)]
+        rms, K, D, rvecs, tvecs, errors = calibrate_active()
+
+    final_errors = dict(zip(active, errors))
+    report = {
+        'rms': float(rms),
+        'rejection_threshold_px':
+            float(rejection_threshold) if rejection_threshold is not None else None,
+        'final_error_px': {
+            'min': float(np.min(errors)),
+            'median': float(np.median(errors)),
+            'max': float(np.max(errors)),
+        },
+        'views': [{
+            'file': fnames[i],
+            'initial_error_px': float(all_errors[i]),
+            'final_error_px': float(final_errors[i]) if i in final_errors else None,
+            'status': 'selected' if i in final_errors else
+                      ('rejected' if i in rejected else 'unused'),
+        } for i in range(len(img_points))],
+        'selected': [fnames[i] for i in active],
+        'rejected': [fnames[i] for i in rejected],
+    }
+    return rms, K, D, rvecs, tvecs, report
+
+
+def excluded_fnames(report):
+    """Снимки, не вошедшие в калибровку: отбракованные и не выбранные (--max-views)"""
+    return [v['file'] for v in report['views'] if v['status'] != 'selected']
+
+
+def save_report(path, report):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
@@ -1,6 +1,9 @@
 import cv2
 import numpy as np
 
+from distortion import distort_points
+from grid_render import LineLayer, render_tiled
+
 # --- 1. Ваши данные калибровки ---
 # Матрица камеры (K)
 K = np.array([
@@ -26,76 +29,60 @@ COLOR_UNDISTORTED = (0, 255, 0)  # Зеленый (Идеальная сетка
 COLOR_DISTORTED = (0, 0, 255)    # Красный (Искаженная сетка)
 LINE_THICKNESS = 1               # Устанавливаем толщину 1px для лучшего сравнения
 
-# --- 3. Создание изображения (ИЗМЕНЕНО) ---
-# Создаем ОДНО пустое белое изображение
-img_comparison = np.full((IMG_HEIGHT, IMG_WIDTH, 3), BG_COLOR, dtype=np.uint8)
+# --- 3. Режим отрисовки ---
+# Высота полосы для отрисовки по частям (grid_render.py): в памяти только одна полоса,
+# строки сразу сжимаются в PNG. None — рисовать на полном холсте, как раньше.
+TILE_HEIGHT = 256
+# Во сколько раз увеличить выходное изображение (например, 4 — для детального осмотра краев)
+RENDER_SCALE = 1
 
-# --- 4. Извлечение параметров камеры ---
-fx, fy = K[0, 0], K[1, 1]
-cx, cy = K[0, 2], K[1, 2]
-k1, k2, p1, p2, k3 = D[0], D[1], D[2], D[3], D[4]
+OUT_WIDTH = IMG_WIDTH * RENDER_SCALE
+OUT_HEIGHT = IMG_HEIGHT * RENDER_SCALE
 
-# --- 5. Функция для применения дисторсии к точке ---
-# (Остается без изменений)
+# --- 4. Функция для применения дисторсии к точкам ---
+# Векторизованная модель из distortion.py: принимает массивы координат
 def apply_distortion(u, v):
-    # 1. Нормализация (перевод в "идеальные" координаты)
-    x_norm = (u - cx) / fx
-    y_norm = (v - cy) / fy
-
-    # 2. Расчет радиальной дисторсии
-    r2 = x_norm**2 + y_norm**2
-    r4 = r2**2
-    r6 = r4 * r2
-    radial_dist = (1 + k1*r2 + k2*r4 + k3*r6)
-
-    # 3. Расчет тангенциальной дисторсии
-    dx_tan = (2*p1*x_norm*y_norm + p2*(r2 + 2*x_norm**2))
-    dy_tan = (p1*(r2 + 2*y_norm**2) + 2*p2*x_norm*y_norm)
-    
-    # 4. Применение дисторсии к нормализованным координатам
-    x_dist_norm = x_norm * radial_dist + dx_tan
-    y_dist_norm = y_norm * radial_dist + dy_tan
-
-    # 5. Де-нормализация (возврат в пиксельные координаты)
-    u_dist = x_dist_norm * fx + cx
-    v_dist = y_dist_norm * fy + cy
-    
-    return int(round(u_dist)), int(round(v_dist))
-
-# --- 6. Генерация и отрисовка сеток (ИЗМЕНЕНО) ---
+    u_dist, v_dist = distort_points(u, v, K, D)
+    return (np.rint(u_dist * RENDER_SCALE).astype(np.int32),
+            np.rint(v_dist * RENDER_SCALE).astype(np.int32))
+
+# --- 5. Генерация линий сетки ---
+# Все линии одного направления — один массив формы (линии, точки, 2)
+def grid_lines():
+    xs = np.arange(0, IMG_WIDTH + 1, 10)   # +1 чтобы дойти до края
+    ys = np.arange(0, IMG_HEIGHT + 1, 10)
+    h_v = np.arange(0, IMG_HEIGHT, GRID_STEP)
+    v_u = np.arange(0, IMG_WIDTH, GRID_STEP)
+
+    # Горизонтальные линии: u меняется вдоль линии, v постоянна
+    hu, hv = np.meshgrid(xs, h_v)
+    # Вертикальные линии: v меняется вдоль линии, u постоянна
+    vv, vu = np.meshgrid(ys, v_u)
+    return (hu, hv), (vu, vv)
+
+# --- 6. Отрисовка сеток ---
 
 print("Генерация сеток...")
 
-# Горизонтальные линии
-for v in range(0, IMG_HEIGHT, GRID_STEP):
-    points_undistorted = []
-    points_distorted = []
-    
-    for u in range(0, IMG_WIDTH + 1, 10): # +1 чтобы дойти до края
-        points_undistorted.append((u, v))
-        points_distorted.append(apply_distortion(u, v))
-    
-    # Рисуем обе линии на ОДНОМ изображении
-    cv2.polylines(img_comparison, [np.array(points_undistorted, dtype=np.int32)], False, COLOR_UNDISTORTED, LINE_THICKNESS)
-    cv2.polylines(img_comparison, [np.array(points_distorted, dtype=np.int32)], False, COLOR_DISTORTED, LINE_THICKNESS)
-
-# Вертикальные линии
-for u in range(0, IMG_WIDTH, GRID_STEP):
-    points_undistorted = []
-    points_distorted = []
-
-    for v in range(0, IMG_HEIGHT + 1, 10): # +1 чтобы дойти до края
-        points_undistorted.append((u, v))
-        points_distorted.append(apply_distortion(u, v))
-        
-    # Рисуем обе линии на ОДНОМ изображении
-    cv2.polylines(img_comparison, [np.array(points_undistorted, dtype=np.int32)], False, COLOR_UNDISTORTED, LINE_THICKNESS)
-    cv2.polylines(img_comparison, [np.array(points_distorted, dtype=np.int32)], False, COLOR_DISTORTED, LINE_THICKNESS)
-
-
-# --- 7. Сохранение результатов (ИЗМЕНЕНО) ---
+layers = []
+for u, v in grid_lines():
+    undistorted = (np.stack([u, v], axis=-1) * RENDER_SCALE).astype(np.int32)
+    distorted = np.stack(apply_distortion(u, v), axis=-1)
+    # Порядок слоев как при рисовании на одном холсте: сначала идеальная, затем искаженная
+    layers.append(LineLayer(undistorted, COLOR_UNDISTORTED, LINE_THICKNESS))
+    layers.append(LineLayer(distorted, COLOR_DISTORTED, LINE_THICKNESS))
+
+
+# --- 7. Сохранение результатов ---
 print("Сохранение изображения...")
-cv2.imwrite("comparison_grid.png", img_comparison)
+if TILE_HEIGHT:
+    render_tiled("comparison_grid.png", OUT_WIDTH, OUT_HEIGHT, layers, BG_COLOR, TILE_HEIGHT)
+else:
+    # Рисуем обе сетки на ОДНОМ изображении
+    img_comparison = np.full((OUT_HEIGHT, OUT_WIDTH, 3), BG_COLOR, dtype=np.uint8)
+    for layer in layers:
+        layer.draw(img_comparison, 0)
+    cv2.imwrite("comparison_grid.png", img_comparison)
 
 print(f"Готово! Создан 'comparison_grid.png'.")
 print("Совет: Откройте файл и сильно увеличьте края, чтобы увидеть разницу.")
\ No newline at end of file